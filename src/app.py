@@ -3,34 +3,77 @@ Flask Application for Logistics Management
 Provides web interface for managing products, customers, templates, and PO processing workflow
 """
 
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify, session
+from flask import Flask, Request, render_template, request, redirect, url_for, flash, send_from_directory, jsonify, session, make_response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
+import orjson
+import copy
+import functools
+import hashlib
+import io
+import logging
 import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-import json
 from datetime import datetime
 
-# Import Supabase service
-from .supabase_service import get_supabase_service
 
-from .backend import (
-    DocumentManager,
-    generate_form_schema_for_template,
-    list_form_schemas,
-    get_form_schema,
-    delete_form_schema,
-    setup_form_schemas
-)
-from .modules import Account, SavedProduct, Address, Buyer, UnitType, Country
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson; unknown types fall back to Flask's default hook"""
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+class UploadRequest(Request):
+    """Request that keeps multipart uploads in memory up to MAX_CONTENT_LENGTH"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Werkzeug spools anything over 500KB to disk; uploads are capped at
+        # MAX_CONTENT_LENGTH anyway, so keep them in memory and skip the temp file.
+        return tempfile.SpooledTemporaryFile(max_size=self.max_content_length or 0, mode='rb+')
+
 
 app = Flask(__name__,
             template_folder='../templates_flask',
             static_folder='../static')
+app.request_class = UploadRequest
+app.json = ORJSONProvider(app)
 
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
 
+# Match routes with or without a trailing slash instead of issuing 308 redirects
+app.url_map.strict_slashes = False
+
+# Outside debug mode, keep compiled templates cached instead of re-stat'ing them per render,
+# and persist their bytecode so new workers (or warm serverless instances) skip re-parsing
+if not app.debug:
+    from jinja2 import FileSystemBytecodeCache
+    app.config['TEMPLATES_AUTO_RELOAD'] = False
+    app.jinja_env.auto_reload = False
+    app.jinja_env.cache_size = 400
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache()  # per-user dir under the system temp dir
+
+# Request logging goes through app.logger; DEBUG output is skipped unless LOG_LEVEL asks for it
+app.logger.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+
+# Deployment environment, read once at import
+IS_VERCEL = bool(os.getenv('VERCEL'))
+
 # Use /tmp for serverless environments (Vercel), local paths for development
-if os.getenv('VERCEL'):
+if IS_VERCEL:
     # Vercel serverless environment - use /tmp (ephemeral)
     app.config['UPLOAD_FOLDER'] = Path('/tmp/uploads')
     app.config['EXPORT_FOLDER'] = Path('/tmp/export')
@@ -40,40 +83,312 @@ else:
     app.config['EXPORT_FOLDER'] = Path(__file__).parent.parent / 'export'
 
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload
-app.config['ALLOWED_EXTENSIONS'] = {'pdf', 'png', 'jpg', 'jpeg'}
 
-# Ensure necessary folders exist (safe for both local and serverless)
-try:
-    app.config['UPLOAD_FOLDER'].mkdir(parents=True, exist_ok=True)
-    app.config['EXPORT_FOLDER'].mkdir(parents=True, exist_ok=True)
-except (OSError, PermissionError) as e:
-    # In read-only environments, folders may not be creatable
-    # This is okay - they'll be created when needed in /tmp
-    print(f"Note: Could not create folders at startup: {e}")
+# Serve stored documents by redirecting to a short-lived Supabase signed URL;
+# set SIGNED_URL_DOWNLOADS=0 to proxy the bytes through Flask instead
+app.config['SIGNED_URL_DOWNLOADS'] = os.getenv('SIGNED_URL_DOWNLOADS', '1') != '0'
+app.config['SIGNED_URL_TTL'] = 300  # seconds
+
+# Exported files are handed to gunicorn's wsgi.file_wrapper, which sends them
+# with sendfile(). Behind Apache/lighttpd, set USE_X_SENDFILE=1 so the front
+# server reads the file itself and the worker only emits headers.
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', '0') == '1'
+
+# Project paths and immutable lookup sets, built once at import
+_TEMPLATES_DIR = Path(__file__).resolve().parent.parent / 'templates'
+_EXPORT_DIR = Path(__file__).resolve().parent.parent / 'export'
+_EDITABLE_TEMPLATES = ('BOL_Template.txt', 'PackingSlip_Template.txt', 'HansonChemicals.txt')
+_ALLOWED_EXT = frozenset({'pdf', 'png', 'jpg', 'jpeg'})
+_ALLOWED_TEMPLATES = frozenset(_EDITABLE_TEMPLATES)
+_CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+}
+
+app.config['ALLOWED_EXTENSIONS'] = _ALLOWED_EXT
 
-# Initialize Supabase service and document manager
-supabase = get_supabase_service()
-doc_manager = DocumentManager()
+# Upload/export folders are created on first use (see ensure_dir) rather than
+# at import, so cold starts don't pay for the mkdir syscalls.
+
+
+# ============================================================================
+# LAZY SERVICES
+# ============================================================================
+# The Supabase client and DocumentManager (Reducto/OpenAI) are expensive to
+# import and connect, so they are created on first use instead of at import.
+# This keeps cold starts cheap for routes that never touch them.
+
+@functools.lru_cache(maxsize=1)
+def _svc():
+    """Get the shared Supabase service, creating it on first use"""
+    from .supabase_service import get_supabase_service
+    return get_supabase_service()
+
+
+@functools.lru_cache(maxsize=1)
+def _doc_manager():
+    """Get the shared DocumentManager, creating it on first use"""
+    from .backend import DocumentManager
+    return DocumentManager()
+
+
+def __getattr__(name):
+    """Resolve legacy module attributes (supabase, doc_manager, UnitType) lazily"""
+    if name == 'supabase':
+        return _svc()
+    if name == 'doc_manager':
+        return _doc_manager()
+    if name == 'UnitType':
+        from .modules import UnitType
+        return UnitType
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
+def file_extension(filename):
+    """Lowercased extension of filename without the dot ('' if there is none)"""
+    dot = filename.rfind('.')
+    return filename[dot + 1:].lower() if dot >= 0 else ''
+
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
+    return file_extension(filename) in _ALLOWED_EXT
+
+
+# Names secure_filename would return unchanged: ASCII letters, digits, dots,
+# dashes and underscores, not starting or ending with '.' or '_'
+_SAFE_NAME_RE = re.compile(r'[A-Za-z0-9-](?:[A-Za-z0-9._-]{0,198}[A-Za-z0-9-])?')
+
+
+def safe_filename(filename):
+    """secure_filename, skipping its normalization pass for names that are already safe"""
+    if os.name != 'nt' and _SAFE_NAME_RE.fullmatch(filename):
+        return filename
+    return secure_filename(filename)
+
+
+def content_type_for(filename):
+    """MIME type for a stored document, by extension"""
+    return _CONTENT_TYPES.get(file_extension(filename), 'application/octet-stream')
+
+
+def file_timestamp(now):
+    """now as YYYYmmdd_HHMMSS for unique file names (same as strftime, without the format parse)"""
+    return f"{now.year:04d}{now.month:02d}{now.day:02d}_{now.hour:02d}{now.minute:02d}{now.second:02d}"
+
+
+def storage_month(now):
+    """now as the YYYY/mm storage folder prefix"""
+    return f"{now.year:04d}/{now.month:02d}"
+
+
+# Short-lived in-process cache for read-mostly views: {key: (expires_at, value)},
+# least recently used first. Expired entries are swept on every store.
+DASHBOARD_CACHE_TTL = 15  # seconds
+VIEW_CACHE_SIZE = 128
+_view_cache = OrderedDict()
+_view_cache_lock = threading.Lock()
+
+
+def cached_value(key, loader, ttl=DASHBOARD_CACHE_TTL):
+    """Return a cached value for key, calling loader() if missing or expired"""
+    now = time.monotonic()
+    with _view_cache_lock:
+        entry = _view_cache.get(key)
+        if entry and entry[0] > now:
+            _view_cache.move_to_end(key)
+            return entry[1]
+    value = loader()
+    cache_put(key, value, ttl)
+    return value
+
+
+def cache_put(key, value, ttl=DASHBOARD_CACHE_TTL):
+    """Store a value computed elsewhere so a later cached_value() call can reuse it"""
+    now = time.monotonic()
+    with _view_cache_lock:
+        _view_cache[key] = (now + ttl, value)
+        _view_cache.move_to_end(key)
+        for stale in [k for k, (expires_at, _) in _view_cache.items() if expires_at <= now]:
+            del _view_cache[stale]
+        while len(_view_cache) > VIEW_CACHE_SIZE:
+            _view_cache.popitem(last=False)
+
+
+def invalidate_cache(*keys):
+    """Drop cached values so the next read goes back to Supabase"""
+    with _view_cache_lock:
+        for key in keys:
+            _view_cache.pop(key, None)
+
+
+def invalidate_dashboard():
+    """Drop cached dashboard statistics and recent documents"""
+    invalidate_cache('dashboard_stats', 'recent_docs')
+
+
+# How long po_review's resolved BOL/packing slip data is reused by po_generate
+GENERATED_DATA_TTL = 600  # seconds
+
+
+def generated_data_key(doc_id):
+    """Cache key for a PO's resolved BOL/packing slip data"""
+    return f'generated_data:{doc_id}'
+
+
+# Window after which list-page ETags change even without a local write, bounding
+# staleness from writes handled by other workers
+LIST_ETAG_TTL = 30  # seconds
+
+
+def conditional_page(tables, render):
+    """
+    Render a list page tagged with a weak ETag built from the service's per-table
+    write versions. If the client already holds this version (and no flash message
+    is pending), answer 304 without querying Supabase or rendering the template.
+    """
+    version = _svc().data_version(*tables)
+    etag = f'{"+".join(tables)}-{os.getpid():x}-{version}-{int(time.time() // LIST_ETAG_TTL)}'
+    if '_flashes' not in session and request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(render())
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def crud_errors():
+    """
+    Exception types a form handler reports back to the user as a flash message.
+    Anything else propagates to the 500 handler. Resolved lazily (except clauses
+    are only evaluated when an exception is raised) to keep Supabase off the import path.
+    """
+    from .supabase_service import SupabaseError
+    return (SupabaseError, ValueError, KeyError, TypeError)
+
+
+# Worker threads for overlapping independent Supabase round-trips within a request
+IO_POOL_WORKERS = 8
+# Separate, smaller pool for long AI/Reducto calls so they can't starve Supabase lookups
+AI_POOL_WORKERS = 4
+
+
+@functools.lru_cache(maxsize=1)
+def _io_pool():
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=IO_POOL_WORKERS, thread_name_prefix='supabase-io')
+
+
+@functools.lru_cache(maxsize=1)
+def _ai_pool():
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=AI_POOL_WORKERS, thread_name_prefix='ai')
+
+
+def run_in_pool(pool, **calls):
+    """
+    Run independent zero-argument callables on pool and return their results by
+    keyword. The first exception raised by any call is re-raised.
+    """
+    futures = {name: pool.submit(call) for name, call in calls.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def run_concurrently(**calls):
+    """Run independent Supabase calls concurrently on the I/O pool (see run_in_pool)"""
+    return run_in_pool(_io_pool(), **calls)
+
+
+def run_ai_concurrently(**calls):
+    """Run independent AI/Reducto calls concurrently on the AI pool (see run_in_pool)"""
+    return run_in_pool(_ai_pool(), **calls)
+
+
+@app.template_filter('prettyjson')
+def pretty_json(obj):
+    """Indented JSON for display in templates; values orjson can't encode are rendered with str()"""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+
+
+# Directories already created by ensure_dir in this process
+_ready_dirs = set()
 
 
 def ensure_dir(directory):
-    """Ensure directory exists, creating it if necessary"""
+    """Ensure directory exists, creating it at most once per process"""
+    if directory in _ready_dirs:
+        return
     try:
         Path(directory).mkdir(parents=True, exist_ok=True)
+        _ready_dirs.add(directory)
     except (OSError, PermissionError):
         pass  # Directory might already exist or be in read-only filesystem
 
 
+# ============================================================================
+# FORM PARSING
+# ============================================================================
+# Each helper reads request.form once and returns the column dict used for both
+# create and update calls.
+
+_ADDRESS_TEXT_FIELDS = ('name', 'address', 'city', 'state', 'zip_code')
+_ADDRESS_OPTIONAL_FIELDS = ('phone', 'email', 'account_id', 'seller_company_id', 'label')
+
+
+def product_form_data(form):
+    """Build product columns from a submitted product form"""
+    return {
+        'name': form.get('name'),
+        'description': form.get('description'),
+        'item_number': form.get('item_number') or None,
+        'un_code': form.get('un_code') or None,
+        'default_unit_type': form.get('unit_type', 'kg'),
+        'default_handling_unit_type': form.get('handling_unit_type', 'IBC'),
+        'notes': form.get('notes') or None
+    }
+
+
+def customer_form_data(form):
+    """Build account columns from a submitted customer form"""
+    return {
+        'company_name': form.get('company_name'),
+        'customer_id': form.get('customer_id'),
+        'default_payment_terms': form.get('payment_terms', 'NET 90 DAYS'),
+        'default_delivery_terms': form.get('delivery_terms', 'Free Carrier DESTINATION'),
+        'notes': form.get('notes') or None
+    }
+
+
+def address_form_data(form):
+    """Build address columns from a submitted address form"""
+    data = {k: form.get(k) for k in _ADDRESS_TEXT_FIELDS}
+    data.update({k: form.get(k) or None for k in _ADDRESS_OPTIONAL_FIELDS})
+    data['country'] = form.get('country', 'USA')
+    data['address_type'] = form.get('address_type', 'shipping')
+    data['is_default'] = form.get('is_default') == 'on'
+    return data
+
+
+def seller_form_data(form):
+    """Build seller company columns from a submitted seller form"""
+    return {
+        'company_name': form.get('company_name'),
+        'default_salesperson': form.get('default_salesperson') or None,
+        'phone': form.get('phone') or None,
+        'email': form.get('email') or None,
+        'notes': form.get('notes') or None,
+        'is_default': form.get('is_default') == 'on'
+    }
+
+
 # ============================================================================
 # FAVICON ROUTE (suppress 404 errors)
 # ============================================================================
@@ -91,12 +406,11 @@ def favicon():
 @app.route('/')
 def index():
     """Dashboard/Home page"""
-    stats = supabase.get_statistics()
+    stats = cached_value('dashboard_stats', lambda: _svc().get_statistics())
 
-    # Get recent documents (last 5)
+    # Get recent documents (last 5, sorted by created_at DESC server-side)
     try:
-        all_docs = supabase.list_documents()
-        recent_docs = all_docs[:5] if all_docs else []  # Already sorted by created_at DESC
+        recent_docs = cached_value('recent_docs', lambda: _svc().list_documents(limit=5))
     except:
         recent_docs = []
 
@@ -106,102 +420,126 @@ def index():
 
 
 # ============================================================================
-# PRODUCT ROUTES
+# CRUD ROUTES
 # ============================================================================
+# Products, customers, addresses and sellers share the same list/create/edit/
+# delete flow, so those routes are generated from one factory. Resource-specific
+# views (customer/seller detail pages, the combined address list) follow below.
+
+def register_crud(resource, label, item_var, id_param, title_field, form_data, methods,
+                  tables=(), form_context=None, list_view=True, affects_dashboard=False):
+    """
+    Register list/create/edit/delete routes for a Supabase-backed resource
+
+    Args:
+        resource: URL prefix, endpoint prefix and template folder (e.g. 'products')
+        label: Name used in flash messages (e.g. 'Product')
+        item_var: Template variable holding the record on the edit page (e.g. 'product')
+        id_param: URL parameter carrying the record key (e.g. 'product_id')
+        title_field: Column shown in success messages (e.g. 'name')
+        form_data: Function building the column dict from request.form
+        methods: SupabaseService method names as (list, get, create, update, delete)
+        tables: Service tables whose write versions make up the list page ETag
+        form_context: Optional function returning extra context for create/edit pages
+        list_view: Whether to register the list route (False if the resource has its own)
+        affects_dashboard: Whether create/delete changes the dashboard statistics
+    """
+    list_name, get_name, create_name, update_name, delete_name = methods
+    list_endpoint = f'{resource}_list'
+
+    def extra_context():
+        return form_context() if form_context else {}
+
+    def list_records():
+        return conditional_page(tables, lambda: render_template(
+            f'{resource}/list.html', **{resource: getattr(_svc(), list_name)()}))
+
+    def create_record():
+        if request.method == 'POST':
+            try:
+                record = getattr(_svc(), create_name)(**form_data(request.form))
+                if affects_dashboard:
+                    invalidate_dashboard()
+                flash(f'{label} "{record[title_field]}" created successfully!', 'success')
+                return redirect(url_for(list_endpoint))
+            except crud_errors() as e:
+                flash(f'Error creating {label.lower()}: {str(e)}', 'error')
+
+        return render_template(f'{resource}/create.html', **extra_context())
+
+    def edit_record(**view_args):
+        record_id = view_args[id_param]
+        record = getattr(_svc(), get_name)(record_id)
+        if not record:
+            flash(f'{label} not found', 'error')
+            return redirect(url_for(list_endpoint))
+
+        if request.method == 'POST':
+            try:
+                update_data = form_data(request.form)
+                getattr(_svc(), update_name)(record_id, update_data)
+                flash(f'{label} "{update_data[title_field]}" updated successfully!', 'success')
+                return redirect(url_for(list_endpoint))
+            except crud_errors() as e:
+                flash(f'Error updating {label.lower()}: {str(e)}', 'error')
+
+        return render_template(f'{resource}/edit.html', **{item_var: record}, **extra_context())
+
+    def delete_record(**view_args):
+        if getattr(_svc(), delete_name)(view_args[id_param]):
+            if affects_dashboard:
+                invalidate_dashboard()
+            flash(f'{label} deleted successfully!', 'success')
+        else:
+            flash(f'Failed to delete {label.lower()}', 'error')
+        return redirect(url_for(list_endpoint))
 
-@app.route('/products')
-def products_list():
-    """List all products"""
-    products = supabase.list_products()
-    return render_template('products/list.html', products=products)
-
-
-@app.route('/products/create', methods=['GET', 'POST'])
-def products_create():
-    """Create new product"""
-    if request.method == 'POST':
-        try:
-            name = request.form.get('name')
-            description = request.form.get('description')
-            item_number = request.form.get('item_number') or None
-            un_code = request.form.get('un_code') or None
-            unit_type = request.form.get('unit_type', 'kg')
-            handling_unit_type = request.form.get('handling_unit_type', 'IBC')
-            notes = request.form.get('notes') or None
-
-            product = supabase.create_product(
-                name=name,
-                description=description,
-                item_number=item_number,
-                un_code=un_code,
-                default_unit_type=unit_type,
-                default_handling_unit_type=handling_unit_type,
-                notes=notes
-            )
-            flash(f'Product "{product["name"]}" created successfully!', 'success')
-            return redirect(url_for('products_list'))
-        except Exception as e:
-            flash(f'Error creating product: {str(e)}', 'error')
-
-    unit_types = [e.value for e in UnitType]
-    return render_template('products/create.html', unit_types=unit_types)
-
+    if list_view:
+        app.add_url_rule(f'/{resource}', list_endpoint, list_records)
+    app.add_url_rule(f'/{resource}/create', f'{resource}_create', create_record,
+                     methods=['GET', 'POST'])
+    app.add_url_rule(f'/{resource}/<{id_param}>/edit', f'{resource}_edit', edit_record,
+                     methods=['GET', 'POST'])
+    app.add_url_rule(f'/{resource}/<{id_param}>/delete', f'{resource}_delete', delete_record,
+                     methods=['POST'])
 
-@app.route('/products/<product_id>/edit', methods=['GET', 'POST'])
-def products_edit(product_id):
-    """Edit existing product"""
-    product = supabase.get_product(product_id)
-    if not product:
-        flash('Product not found', 'error')
-        return redirect(url_for('products_list'))
 
-    if request.method == 'POST':
-        try:
-            update_data = {
-                'name': request.form.get('name'),
-                'description': request.form.get('description'),
-                'item_number': request.form.get('item_number') or None,
-                'un_code': request.form.get('un_code') or None,
-                'default_unit_type': request.form.get('unit_type', 'kg'),
-                'default_handling_unit_type': request.form.get('handling_unit_type', 'IBC'),
-                'notes': request.form.get('notes') or None
-            }
+def product_form_context():
+    """Unit type choices for the product forms"""
+    from .modules import UnitType
+    return {'unit_types': [e.value for e in UnitType]}
 
-            supabase.update_product(product_id, update_data)
-            flash(f'Product "{update_data["name"]}" updated successfully!', 'success')
-            return redirect(url_for('products_list'))
-        except Exception as e:
-            flash(f'Error updating product: {str(e)}', 'error')
 
-    unit_types = [e.value for e in UnitType]
-    return render_template('products/edit.html', product=product, unit_types=unit_types)
+def address_form_context():
+    """Customer and seller company choices for the address forms"""
+    return {
+        'customers': _svc().list_accounts(),
+        'seller_companies': _svc().list_seller_companies()
+    }
 
 
-@app.route('/products/<product_id>/delete', methods=['POST'])
-def products_delete(product_id):
-    """Delete product"""
-    if supabase.delete_product(product_id):
-        flash('Product deleted successfully!', 'success')
-    else:
-        flash('Failed to delete product', 'error')
-    return redirect(url_for('products_list'))
+register_crud('products', 'Product', 'product', 'product_id', 'name', product_form_data,
+              ('list_products', 'get_product', 'create_product', 'update_product', 'delete_product'),
+              tables=('products',), form_context=product_form_context, affects_dashboard=True)
 
+register_crud('customers', 'Customer', 'customer', 'customer_id', 'company_name', customer_form_data,
+              ('list_accounts', 'get_account', 'create_account', 'update_account', 'delete_account'),
+              tables=('accounts',), affects_dashboard=True)
 
-# ============================================================================
-# CUSTOMER ROUTES
-# ============================================================================
+register_crud('addresses', 'Address', 'address', 'address_id', 'name', address_form_data,
+              (None, 'get_address', 'create_address', 'update_address', 'delete_address'),
+              form_context=address_form_context, list_view=False)
 
-@app.route('/customers')
-def customers_list():
-    """List all customers"""
-    customers = supabase.list_accounts()
-    return render_template('customers/list.html', customers=customers)
+register_crud('sellers', 'Seller company', 'seller', 'seller_id', 'company_name', seller_form_data,
+              ('list_seller_companies', 'get_seller_company', 'create_seller_company',
+               'update_seller_company', 'delete_seller_company'),
+              tables=('seller_companies',))
 
 
 @app.route('/customers/<customer_id>/view')
 def customers_view(customer_id):
     """View customer details with associated documents"""
-    customer = supabase.get_account_with_documents(customer_id)
+    customer = _svc().get_account_with_documents(customer_id)
     if not customer:
         flash('Customer not found', 'error')
         return redirect(url_for('customers_list'))
@@ -209,210 +547,36 @@ def customers_view(customer_id):
     return render_template('customers/view.html', customer=customer)
 
 
-@app.route('/customers/create', methods=['GET', 'POST'])
-def customers_create():
-    """Create new customer"""
-    if request.method == 'POST':
-        try:
-            company_name = request.form.get('company_name')
-            customer_id = request.form.get('customer_id')
-            payment_terms = request.form.get('payment_terms', 'NET 90 DAYS')
-            delivery_terms = request.form.get('delivery_terms', 'Free Carrier DESTINATION')
-            notes = request.form.get('notes') or None
-
-            account = supabase.create_account(
-                company_name=company_name,
-                customer_id=customer_id,
-                default_payment_terms=payment_terms,
-                default_delivery_terms=delivery_terms,
-                notes=notes
-            )
-            flash(f'Customer "{account["company_name"]}" created successfully!', 'success')
-            return redirect(url_for('customers_list'))
-        except Exception as e:
-            flash(f'Error creating customer: {str(e)}', 'error')
-
-    return render_template('customers/create.html')
-
-
-@app.route('/customers/<customer_id>/edit', methods=['GET', 'POST'])
-def customers_edit(customer_id):
-    """Edit existing customer"""
-    customer = supabase.get_account(customer_id)
-    if not customer:
-        flash('Customer not found', 'error')
-        return redirect(url_for('customers_list'))
-
-    if request.method == 'POST':
-        try:
-            update_data = {
-                'company_name': request.form.get('company_name'),
-                'customer_id': request.form.get('customer_id'),
-                'default_payment_terms': request.form.get('payment_terms', 'NET 90 DAYS'),
-                'default_delivery_terms': request.form.get('delivery_terms', 'Free Carrier DESTINATION'),
-                'notes': request.form.get('notes') or None
-            }
-
-            supabase.update_account(customer_id, update_data)
-            flash(f'Customer "{update_data["company_name"]}" updated successfully!', 'success')
-            return redirect(url_for('customers_list'))
-        except Exception as e:
-            flash(f'Error updating customer: {str(e)}', 'error')
-
-    return render_template('customers/edit.html', customer=customer)
-
-
-@app.route('/customers/<customer_id>/delete', methods=['POST'])
-def customers_delete(customer_id):
-    """Delete customer"""
-    if supabase.delete_account(customer_id):
-        flash('Customer deleted successfully!', 'success')
-    else:
-        flash('Failed to delete customer', 'error')
-    return redirect(url_for('customers_list'))
-
-
-# ============================================================================
-# ADDRESS ROUTES
-# ============================================================================
-
 @app.route('/addresses')
 def addresses_list():
     """List all addresses"""
-    seller_addresses = supabase.list_seller_addresses()
-    customers = supabase.list_accounts()
-    
-    # Get addresses for each customer
-    customer_addresses = []
-    for customer in customers:
-        addrs = supabase.list_customer_addresses(customer['id'])
-        for addr in addrs:
-            addr['customer'] = customer
-            customer_addresses.append(addr)
-    
-    return render_template('addresses/list.html', 
-                         seller_addresses=seller_addresses,
-                         customer_addresses=customer_addresses)
-
-
-@app.route('/addresses/create', methods=['GET', 'POST'])
-def addresses_create():
-    """Create new address"""
-    if request.method == 'POST':
-        try:
-            address = supabase.create_address(
-                name=request.form.get('name'),
-                address=request.form.get('address'),
-                city=request.form.get('city'),
-                state=request.form.get('state'),
-                zip_code=request.form.get('zip_code'),
-                country=request.form.get('country', 'USA'),
-                phone=request.form.get('phone') or None,
-                email=request.form.get('email') or None,
-                address_type=request.form.get('address_type', 'shipping'),
-                account_id=request.form.get('account_id') or None,
-                seller_company_id=request.form.get('seller_company_id') or None,
-                is_default=request.form.get('is_default') == 'on',
-                label=request.form.get('label') or None
-            )
-            flash(f'Address "{address["name"]}" created successfully!', 'success')
-            return redirect(url_for('addresses_list'))
-        except Exception as e:
-            flash(f'Error creating address: {str(e)}', 'error')
-
-    customers = supabase.list_accounts()
-    seller_companies = supabase.list_seller_companies()
-    return render_template('addresses/create.html', 
-                         customers=customers,
-                         seller_companies=seller_companies)
-
-
-@app.route('/addresses/<address_id>/edit', methods=['GET', 'POST'])
-def addresses_edit(address_id):
-    """Edit existing address"""
-    address = supabase.get_address(address_id)
-    if not address:
-        flash('Address not found', 'error')
-        return redirect(url_for('addresses_list'))
+    return conditional_page(('addresses', 'accounts', 'seller_companies'), _render_addresses_list)
 
-    if request.method == 'POST':
-        try:
-            update_data = {
-                'name': request.form.get('name'),
-                'address': request.form.get('address'),
-                'city': request.form.get('city'),
-                'state': request.form.get('state'),
-                'zip_code': request.form.get('zip_code'),
-                'country': request.form.get('country', 'USA'),
-                'phone': request.form.get('phone') or None,
-                'email': request.form.get('email') or None,
-                'address_type': request.form.get('address_type', 'shipping'),
-                'account_id': request.form.get('account_id') or None,
-                'seller_company_id': request.form.get('seller_company_id') or None,
-                'is_default': request.form.get('is_default') == 'on',
-                'label': request.form.get('label') or None
-            }
-
-            supabase.update_address(address_id, update_data)
-            flash(f'Address "{update_data["name"]}" updated successfully!', 'success')
-            return redirect(url_for('addresses_list'))
-        except Exception as e:
-            flash(f'Error updating address: {str(e)}', 'error')
 
-    customers = supabase.list_accounts()
-    seller_companies = supabase.list_seller_companies()
-    return render_template('addresses/edit.html', 
-                         address=address,
-                         customers=customers,
-                         seller_companies=seller_companies)
+def _render_addresses_list():
+    """Render the seller and customer address tables"""
+    seller_addresses = _svc().list_seller_addresses()
 
+    # Single embedded query instead of one address lookup per customer
+    customer_addresses = _svc().list_all_customer_addresses_with_customer()
 
-@app.route('/addresses/<address_id>/delete', methods=['POST'])
-def addresses_delete(address_id):
-    """Delete address"""
-    if supabase.delete_address(address_id):
-        flash('Address deleted successfully!', 'success')
-    else:
-        flash('Failed to delete address', 'error')
-    return redirect(url_for('addresses_list'))
-
-
-# ============================================================================
-# SELLER COMPANY ROUTES
-# ============================================================================
-
-@app.route('/sellers')
-def sellers_list():
-    """List all seller companies"""
-    sellers = supabase.list_seller_companies()
-    return render_template('sellers/list.html', sellers=sellers)
-
-
-@app.route('/sellers/create', methods=['GET', 'POST'])
-def sellers_create():
-    """Create new seller company"""
-    if request.method == 'POST':
-        try:
-            seller = supabase.create_seller_company(
-                company_name=request.form.get('company_name'),
-                default_salesperson=request.form.get('default_salesperson') or None,
-                phone=request.form.get('phone') or None,
-                email=request.form.get('email') or None,
-                notes=request.form.get('notes') or None,
-                is_default=request.form.get('is_default') == 'on'
-            )
-            flash(f'Seller company "{seller["company_name"]}" created successfully!', 'success')
-            return redirect(url_for('sellers_list'))
-        except Exception as e:
-            flash(f'Error creating seller company: {str(e)}', 'error')
+    # Index customers by account id so each customer dict is shared by all of
+    # its addresses and templates can resolve a customer by hash lookup
+    customer_by_id = {}
+    for addr in customer_addresses:
+        if addr.get('customer'):
+            addr['customer'] = customer_by_id.setdefault(addr['account_id'], addr['customer'])
 
-    return render_template('sellers/create.html')
+    return render_template('addresses/list.html', 
+                         seller_addresses=seller_addresses,
+                         customer_addresses=customer_addresses,
+                         customer_by_id=customer_by_id)
 
 
 @app.route('/sellers/<seller_id>/view')
 def sellers_view(seller_id):
     """View seller company details with addresses"""
-    seller = supabase.get_seller_company(seller_id)
+    seller = _svc().get_seller_company(seller_id)
     if not seller:
         flash('Seller company not found', 'error')
         return redirect(url_for('sellers_list'))
@@ -420,95 +584,88 @@ def sellers_view(seller_id):
     return render_template('sellers/view.html', seller=seller)
 
 
-@app.route('/sellers/<seller_id>/edit', methods=['GET', 'POST'])
-def sellers_edit(seller_id):
-    """Edit existing seller company"""
-    seller = supabase.get_seller_company(seller_id)
-    if not seller:
-        flash('Seller company not found', 'error')
-        return redirect(url_for('sellers_list'))
-
-    if request.method == 'POST':
-        try:
-            update_data = {
-                'company_name': request.form.get('company_name'),
-                'default_salesperson': request.form.get('default_salesperson') or None,
-                'phone': request.form.get('phone') or None,
-                'email': request.form.get('email') or None,
-                'notes': request.form.get('notes') or None,
-                'is_default': request.form.get('is_default') == 'on'
-            }
-
-            supabase.update_seller_company(seller_id, update_data)
-            flash(f'Seller company "{update_data["company_name"]}" updated successfully!', 'success')
-            return redirect(url_for('sellers_list'))
-        except Exception as e:
-            flash(f'Error updating seller company: {str(e)}', 'error')
+# ============================================================================
+# TEMPLATE EDITOR ROUTES
+# ============================================================================
 
-    return render_template('sellers/edit.html', seller=seller)
+# Listing rows for editable templates, reused while a file's (mtime_ns, size) is unchanged:
+# {name: ((mtime_ns, size), row)}
+_template_meta = {}
 
 
-@app.route('/sellers/<seller_id>/delete', methods=['POST'])
-def sellers_delete(seller_id):
-    """Delete seller company"""
-    if supabase.delete_seller_company(seller_id):
-        flash('Seller company deleted successfully!', 'success')
-    else:
-        flash('Failed to delete seller company', 'error')
-    return redirect(url_for('sellers_list'))
+def template_meta(entry):
+    """Listing row for a template directory entry, rebuilt only when the file changed"""
+    st = entry.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _template_meta.get(entry.name)
+    if cached and cached[0] == key:
+        return cached[1]
+    row = {
+        'name': entry.name,
+        'path': entry.path,
+        'size': st.st_size,
+        'modified': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(st.st_mtime))
+    }
+    _template_meta[entry.name] = (key, row)
+    return row
 
 
-# ============================================================================
-# TEMPLATE EDITOR ROUTES
-# ============================================================================
-
 @app.route('/templates')
 def templates_list():
     """List editable templates"""
-    template_dir = Path(__file__).parent.parent / 'templates'
-    templates = []
-
-    for template_name in ['BOL_Template.txt', 'PackingSlip_Template.txt', 'HansonChemicals.txt']:
-        template_path = template_dir / template_name
-        if template_path.exists():
-            templates.append({
-                'name': template_name,
-                'path': str(template_path),
-                'size': template_path.stat().st_size,
-                'modified': datetime.fromtimestamp(template_path.stat().st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-            })
+    try:
+        with os.scandir(_TEMPLATES_DIR) as entries:
+            found = {entry.name: template_meta(entry) for entry in entries
+                     if entry.name in _ALLOWED_TEMPLATES and entry.is_file()}
+    except FileNotFoundError:
+        found = {}
+
+    templates = [found[name] for name in _EDITABLE_TEMPLATES if name in found]
 
     return render_template('templates/edit.html', templates=templates)
 
 
+# Last read or saved content of each editable template: {name: (mtime_ns, content)}
+_template_content = {}
+
+
 @app.route('/templates/<template_name>', methods=['GET', 'POST'])
 def templates_edit(template_name):
     """Edit template content"""
     # Security: only allow specific template files
-    allowed_templates = ['BOL_Template.txt', 'PackingSlip_Template.txt', 'HansonChemicals.txt']
-    if template_name not in allowed_templates:
+    if template_name not in _ALLOWED_TEMPLATES:
         flash('Invalid template name', 'error')
         return redirect(url_for('templates_list'))
 
-    template_dir = Path(__file__).parent.parent / 'templates'
-    template_path = template_dir / template_name
+    template_path = _TEMPLATES_DIR / template_name
 
-    if not template_path.exists():
+    try:
+        st = template_path.stat()
+    except FileNotFoundError:
         flash('Template not found', 'error')
         return redirect(url_for('templates_list'))
 
     if request.method == 'POST':
         try:
             content = request.form.get('content')
-            with open(template_path, 'w') as f:
+            with open(template_path, 'w', encoding='utf-8', newline='') as f:
                 f.write(content)
+                f.flush()
+                # Remember what was written, stamped with the mtime it produced
+                _template_content[template_name] = (os.fstat(f.fileno()).st_mtime_ns, content)
             flash(f'Template "{template_name}" saved successfully!', 'success')
             return redirect(url_for('templates_list'))
-        except Exception as e:
+        except (OSError, UnicodeError) as e:
+            _template_content.pop(template_name, None)
             flash(f'Error saving template: {str(e)}', 'error')
 
-    with open(template_path, 'r') as f:
-        content = f.read()
+    # Only re-read the file when it changed since it was last read or saved
+    cached = _template_content.get(template_name)
+    if cached and cached[0] == st.st_mtime_ns:
+        content = cached[1]
+    else:
+        content = template_path.read_text(encoding='utf-8')
+        _template_content[template_name] = (st.st_mtime_ns, content)
 
     return render_template('templates/edit.html',
                          template_name=template_name,
@@ -520,11 +677,19 @@ def templates_edit(template_name):
 # PO UPLOAD WORKFLOW ROUTES
 # ============================================================================
 
+def find_account(account_id):
+    """Look up an account by UUID in the cached account list, querying only on a miss"""
+    if not account_id:
+        return None
+    for account in _svc().list_accounts():
+        if account['id'] == account_id:
+            return account
+    return _svc().get_account_by_id(account_id)
+
+
 @app.route('/po/upload', methods=['GET', 'POST'])
 def po_upload():
     """Upload PO and select customer"""
-    customers = supabase.list_accounts()
-
     if request.method == 'POST':
         try:
             customer_id = request.form.get('customer_id')
@@ -540,49 +705,56 @@ def po_upload():
                 return redirect(request.url)
 
             if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                unique_filename = f"{timestamp}_{filename}"
-
-                # Save temporarily for processing
-                ensure_dir(app.config['UPLOAD_FOLDER'])  # Ensure directory exists
-                filepath = app.config['UPLOAD_FOLDER'] / unique_filename
-                file.save(filepath)
+                # The form sends the account UUID (id field), not the customer_id field.
+                # Resolve it before parsing so a bad selection doesn't cost an AI call
+                app.logger.debug("PO upload: form account UUID %s", customer_id)
+                account = find_account(customer_id)
+                if not account:
+                    flash(f'Error: Customer not found. Please select a valid customer.', 'error')
+                    app.logger.warning("PO upload: account not found for UUID %s", customer_id)
+                    return redirect(request.url)
 
-                # Process with backend
-                doc = doc_manager.process_document(str(filepath), document_type="PO")
+                account_id = account['id']  # This is already the UUID
+                app.logger.debug("PO upload: found account %s (customer_id %s, UUID %s)",
+                                 account['company_name'], account['customer_id'], account_id)
+
+                filename = safe_filename(file.filename)
+                now = datetime.now()
+                unique_filename = f"{file_timestamp(now)}_{filename}"
+
+                # Read the upload once; the parser, its duplicate check and storage
+                # all work from these bytes, so nothing is written to local disk
+                file_data = file.read()
+                content_hash = hashlib.sha256(file_data).hexdigest()
+
+                # A byte-identical file uploaded before (by any worker, on any day) reuses
+                # its parse. The copy gets no content_hash: the column is unique, and the
+                # first upload's row already answers later lookups
+                duplicate = _svc().get_document_by_hash(content_hash)
+                if duplicate and duplicate.get('parsed_data'):
+                    app.logger.info("PO upload: %s matches document %s, reusing its parse",
+                                    unique_filename, duplicate.get('document_id'))
+                    doc = {
+                        'document_id': _svc().allocate_document_ids(1)[0],
+                        'result_json': duplicate['parsed_data'],
+                    }
+                    content_hash = None
+                else:
+                    # Process with backend
+                    doc = _doc_manager().process_document(unique_filename, document_type="PO",
+                                                          file_data=file_data)
 
                 # Upload to Supabase storage
-                with open(filepath, 'rb') as f:
-                    file_data = f.read()
-
-                storage_path = f"{datetime.now().strftime('%Y/%m')}/{unique_filename}"
-                file_url = supabase.upload_file(
-                    bucket=supabase.BUCKET_UPLOADS,
+                storage_path = f"{storage_month(now)}/{unique_filename}"
+                file_url = _svc().upload_file(
+                    bucket=_svc().BUCKET_UPLOADS,
                     file_path=storage_path,
                     file_data=file_data,
                     content_type='application/pdf'
                 )
 
-                # Get account by ID (UUID from form)
-                print(f"\n=== PO Upload Debug ===")
-                print(f"Form value (account UUID): {customer_id}")
-
-                # The form sends the account UUID (id field), not the customer_id field
-                account = supabase.get_account_by_id(customer_id)
-                if not account:
-                    flash(f'Error: Customer not found. Please select a valid customer.', 'error')
-                    print(f"❌ Account not found for UUID: {customer_id}")
-                    return redirect(request.url)
-
-                account_id = account['id']  # This is already the UUID
-                print(f"✓ Found account: {account['company_name']}")
-                print(f"✓ Account customer_id: {account['customer_id']}")
-                print(f"✓ Account UUID: {account_id}")
-                print(f"=====================\n")
-
                 # Create document record in Supabase
-                created_doc = supabase.create_document(
+                created_doc = _svc().create_document(
                     document_id=doc['document_id'],
                     document_type='PO',
                     document_name=unique_filename,
@@ -590,13 +762,15 @@ def po_upload():
                     file_path=storage_path,
                     file_url=file_url,
                     parsed_data=doc.get('result_json'),
-                    status='processed'
+                    status='processed',
+                    content_hash=content_hash
                 )
-                print(f"Created PO document: {created_doc}")
+                app.logger.debug("Created PO document: %s", created_doc)
 
                 # Store account UUID in session for review page
                 session['current_account_id'] = account_id
 
+                invalidate_dashboard()
                 flash('PO uploaded and parsed successfully!', 'success')
                 return redirect(url_for('po_review', doc_id=doc['document_id']))
             else:
@@ -604,54 +778,66 @@ def po_upload():
         except Exception as e:
             flash(f'Error processing PO: {str(e)}', 'error')
 
-    return render_template('po/upload.html', customers=customers)
+    return render_template('po/upload.html', customers=_svc().list_accounts())
 
 
 @app.route('/po/<int:doc_id>/review')
 def po_review(doc_id):
     """Review parsed PO data and allow editing"""
-    doc = doc_manager.get_document(document_id=doc_id)
+    account_id = session.get('current_account_id')
+    svc = _svc()
+
+    # One embedded query returns the PO with its account, the account's addresses
+    # and any stored BOL/Packing Slip data; the BOL number count runs alongside it
+    fetched = run_concurrently(
+        bundle=lambda: svc.get_review_bundle(doc_id, account_id),
+        next_bol_number=lambda: svc.get_next_bol_number(account_id) if account_id else "",
+    )
+    bundle = fetched['bundle']
 
+    doc = bundle['doc']
     if not doc:
         flash('Document not found', 'error')
         return redirect(url_for('po_upload'))
 
-    account_id = session.get('current_account_id')
-    customer = supabase.get_account_by_id(account_id) if account_id else None
+    # Same normalization as DocumentManager.get_document: templates read 'result_json'
+    if 'parsed_data' in doc and 'result_json' not in doc:
+        doc['result_json'] = doc['parsed_data']
 
-    # Get seller companies and their addresses for selection
-    seller_companies = supabase.list_seller_companies()
-    default_seller = supabase.get_default_seller_company()
-    
-    # Get customer addresses if customer exists
-    customer_addresses = []
-    if customer:
-        customer_addresses = supabase.list_customer_addresses(customer['id'])
-
-    # Generate next BOL number based on customer's PO count
-    next_bol_number = ""
-    if account_id:
-        next_bol_number = supabase.get_next_bol_number(account_id)
-
-    # Try to get cached generated data first
-    cached_data = supabase.get_generated_data(doc_id)
+    customer = bundle['customer']
+    seller_companies = bundle['seller_companies']
+    default_seller = bundle['default_seller']
+    customer_addresses = bundle['customer_addresses']
+    next_bol_number = fetched['next_bol_number']
+
+    # Previously generated data, if any
+    cached_data = bundle['cached_data']
     bol_data = cached_data.get('bol_data')
     ps_data = cached_data.get('packing_slip_data')
     
     # Generate BOL and Packing Slip data using AI only if not cached
     if not bol_data or not ps_data:
         try:
+            # The two generations are independent remote AI calls, so run them concurrently
+            doc_manager = _doc_manager()
+            generate = {}
             if not bol_data:
-                print("🔄 Generating BOL data (not cached)")
-                bol_data = doc_manager.generate_bol_from_po(po_document_id=doc_id, save_to_db=False)
+                app.logger.info("Generating BOL data for PO %s (not cached)", doc_id)
+                generate['bol_data'] = functools.partial(
+                    doc_manager.generate_bol_from_po, po_document_id=doc_id, save_to_db=False)
             else:
-                print("✓ Using cached BOL data")
+                app.logger.debug("Using cached BOL data for PO %s", doc_id)
                 
             if not ps_data:
-                print("🔄 Generating Packing Slip data (not cached)")
-                ps_data = doc_manager.generate_packing_slip_from_po(po_document_id=doc_id, save_to_db=False)
+                app.logger.info("Generating Packing Slip data for PO %s (not cached)", doc_id)
+                generate['ps_data'] = functools.partial(
+                    doc_manager.generate_packing_slip_from_po, po_document_id=doc_id, save_to_db=False)
             else:
-                print("✓ Using cached Packing Slip data")
+                app.logger.debug("Using cached Packing Slip data for PO %s", doc_id)
+
+            generated = run_ai_concurrently(**generate)
+            bol_data = generated.get('bol_data', bol_data)
+            ps_data = generated.get('ps_data', ps_data)
             
             # Override BOL number with our calculated one
             if next_bol_number:
@@ -682,15 +868,21 @@ def po_review(doc_id):
                     ps_data['salesperson'] = default_seller.get('default_salesperson', '')
             
             # Store generated data in Supabase for future use
-            supabase.store_generated_data(doc_id, bol_data=bol_data, packing_slip_data=ps_data)
-            print(f"✓ Stored generated data in PO document (doc_id: {doc_id})")
+            _svc().store_generated_data(doc_id, bol_data=bol_data, packing_slip_data=ps_data)
+            app.logger.debug("Stored generated data in PO document %s", doc_id)
             
         except Exception as e:
             flash(f'Error generating documents: {str(e)}', 'warning')
             bol_data = {}
             ps_data = {}
     else:
-        print(f"✓ Using fully cached data from PO document (doc_id: {doc_id})")
+        app.logger.debug("Using fully cached data from PO document %s", doc_id)
+
+    # Hand the resolved data to po_generate without another Supabase round-trip
+    if bol_data and ps_data:
+        cache_put(generated_data_key(doc_id),
+                  {'bol_data': bol_data, 'packing_slip_data': ps_data},
+                  ttl=GENERATED_DATA_TTL)
 
     return render_template('po/review.html',
                          doc=doc,
@@ -699,8 +891,8 @@ def po_review(doc_id):
                          seller_companies=seller_companies,
                          default_seller=default_seller,
                          next_bol_number=next_bol_number,
-                         bol_data=json.dumps(bol_data, indent=2, default=str),
-                         ps_data=json.dumps(ps_data, indent=2, default=str))
+                         bol_data=bol_data,
+                         ps_data=ps_data)
 
 
 @app.route('/po/<int:doc_id>/generate', methods=['POST'])
@@ -710,71 +902,82 @@ def po_generate(doc_id):
         # Check if user wants to use form schemas
         use_schema = request.form.get('use_schema', 'true').lower() == 'true'
         
-        # Get selected ship_from address
+        # Get selected ship_from / ship_to addresses
         ship_from_address_id = request.form.get('ship_from_address_id')
         ship_to_address_id = request.form.get('ship_to_address_id')
-        
+
+        # Get account_id for BOL number generation
+        account_id = session.get('current_account_id')
+
+        # The PO, both addresses and the next BOL number are independent lookups;
+        # fetch them together. The generators and document records below reuse the PO.
+        svc = _svc()
+        lookups = run_concurrently(
+            po_doc=functools.partial(_doc_manager().get_document, document_id=doc_id),
+            ship_from=functools.partial(svc.get_address, ship_from_address_id) if ship_from_address_id else lambda: None,
+            ship_to=functools.partial(svc.get_address, ship_to_address_id) if ship_to_address_id else lambda: None,
+            bol_number=functools.partial(svc.get_next_bol_number, account_id) if account_id else lambda: None,
+        )
+        po_doc = lookups['po_doc']
+        if not po_doc:
+            raise ValueError("Purchase Order not found")
+        bol_number_override = lookups['bol_number']
+
         # Build address overrides
         address_overrides = {}
-        
-        if ship_from_address_id:
-            ship_from_addr = supabase.get_address(ship_from_address_id)
-            if ship_from_addr:
-                address_overrides['ship_from'] = {
-                    'name': ship_from_addr.get('name'),
-                    'address': ship_from_addr.get('address'),
-                    'city': ship_from_addr.get('city'),
-                    'state': ship_from_addr.get('state'),
-                    'zip_code': ship_from_addr.get('zip_code'),
-                    'country': ship_from_addr.get('country', 'USA'),
-                    'phone': ship_from_addr.get('phone'),
-                    'email': ship_from_addr.get('email')
-                }
-        
-        if ship_to_address_id:
-            ship_to_addr = supabase.get_address(ship_to_address_id)
-            if ship_to_addr:
-                address_overrides['ship_to'] = {
-                    'name': ship_to_addr.get('name'),
-                    'address': ship_to_addr.get('address'),
-                    'city': ship_to_addr.get('city'),
-                    'state': ship_to_addr.get('state'),
-                    'zip_code': ship_to_addr.get('zip_code'),
-                    'country': ship_to_addr.get('country', 'USA'),
-                    'phone': ship_to_addr.get('phone'),
-                    'email': ship_to_addr.get('email')
+        for role in ('ship_from', 'ship_to'):
+            addr = lookups[role]
+            if addr:
+                address_overrides[role] = {
+                    'name': addr.get('name'),
+                    'address': addr.get('address'),
+                    'city': addr.get('city'),
+                    'state': addr.get('state'),
+                    'zip_code': addr.get('zip_code'),
+                    'country': addr.get('country', 'USA'),
+                    'phone': addr.get('phone'),
+                    'email': addr.get('email')
                 }
-        
-        # Get account_id for BOL number generation
-        account_id = session.get('current_account_id')
-        bol_number_override = None
-        if account_id:
-            bol_number_override = supabase.get_next_bol_number(account_id)
-
-        # Get cached generated data to avoid duplicate AI calls
-        cached_data = supabase.get_generated_data(doc_id)
-        cached_bol_data = cached_data.get('bol_data')
-        cached_ps_data = cached_data.get('packing_slip_data')
+
+        # Get cached generated data to avoid duplicate AI calls (usually still
+        # in memory from the review step, otherwise read from the PO row above)
+        cached_data = cached_value(generated_data_key(doc_id),
+                                   lambda: _svc().generated_data_from_doc(po_doc),
+                                   ttl=GENERATED_DATA_TTL)
+        # The generators fill in overrides (addresses, BOL number) in place, so give
+        # them copies; a failed attempt must not leave its overrides in the cache
+        cached_bol_data = copy.deepcopy(cached_data.get('bol_data'))
+        cached_ps_data = copy.deepcopy(cached_data.get('packing_slip_data'))
         
         if cached_bol_data:
-            print(f"✓ Using cached BOL data from review step (saving AI call)")
+            app.logger.debug("Using cached BOL data from review step (saving AI call)")
         if cached_ps_data:
-            print(f"✓ Using cached Packing Slip data from review step (saving AI call)")
-
-        # Generate filled documents with address overrides and cached data
-        bol_result = doc_manager.generate_and_fill_bol(
-            po_document_id=doc_id,
-            use_saved_schema=use_schema,
-            address_overrides=address_overrides,
-            bol_number_override=bol_number_override,
-            bol_data=cached_bol_data  # Pass cached data to skip AI generation
-        )
-        ps_result = doc_manager.generate_and_fill_packing_slip(
-            po_document_id=doc_id,
-            use_saved_schema=use_schema,
-            address_overrides=address_overrides,
-            packing_slip_data=cached_ps_data  # Pass cached data to skip AI generation
+            app.logger.debug("Using cached Packing Slip data from review step (saving AI call)")
+
+        # Generate filled documents with address overrides and cached data; the
+        # two template fills are independent Reducto calls, so run them together
+        doc_manager = _doc_manager()
+        results = run_ai_concurrently(
+            bol=functools.partial(
+                doc_manager.generate_and_fill_bol,
+                po_document_id=doc_id,
+                use_saved_schema=use_schema,
+                address_overrides=address_overrides,
+                bol_number_override=bol_number_override,
+                bol_data=cached_bol_data,  # Pass cached data to skip AI generation
+                po_doc=po_doc
+            ),
+            ps=functools.partial(
+                doc_manager.generate_and_fill_packing_slip,
+                po_document_id=doc_id,
+                use_saved_schema=use_schema,
+                address_overrides=address_overrides,
+                packing_slip_data=cached_ps_data,  # Pass cached data to skip AI generation
+                po_doc=po_doc
+            ),
         )
+        bol_result = results['bol']
+        ps_result = results['ps']
 
         # Extract filenames and paths
         bol_filename = Path(bol_result['output_path']).name
@@ -782,94 +985,60 @@ def po_generate(doc_id):
         bol_filepath = Path(bol_result['output_path'])
         ps_filepath = Path(ps_result['output_path'])
 
-        # Get the original PO document to find the associated account
-        po_doc = supabase.get_document(doc_id)
-        account_id = po_doc.get('account_id') if po_doc else None
-
-        print(f"\n=== Document Generation Debug ===")
-        print(f"PO Document ID: {doc_id}")
-        print(f"PO Document: {po_doc.get('document_name') if po_doc else 'NOT FOUND'}")
-        print(f"Account ID from PO: {account_id}")
-        print(f"================================\n")
-
-        # Generate new document IDs for both BOL and Packing Slip
-        all_docs = supabase.list_documents()
-        max_doc_id = max([d.get('document_id', 0) for d in all_docs], default=0)
-        bol_doc_id = max_doc_id + 1
-        ps_doc_id = max_doc_id + 2
-
-        # Upload BOL to Supabase storage and create document record
-        if bol_filepath.exists():
-            with open(bol_filepath, 'rb') as f:
-                bol_file_data = f.read()
-
-            bol_storage_path = f"{datetime.now().strftime('%Y/%m')}/{bol_filename}"
-            bol_file_url = supabase.upload_file(
-                bucket=supabase.BUCKET_GENERATED,
-                file_path=bol_storage_path,
-                file_data=bol_file_data,
-                content_type='application/pdf'
-            )
-
-            # Create BOL document record
-            print(f"Creating BOL document with account_id: {account_id}")
-            bol_doc = supabase.create_document(
-                document_id=bol_doc_id,
-                document_type='BOL',
-                document_name=bol_filename,
-                account_id=account_id,
-                file_path=bol_storage_path,
-                file_url=bol_file_url,
-                parsed_data=bol_result.get('bol_data'),
-                status='generated'
-            )
-            print(f"Created BOL document: {bol_doc}")
-
-            # Link BOL to original PO
-            if bol_doc:
-                supabase.link_documents(
-                    po_document_id=doc_id,
-                    generated_document_id=bol_doc_id,
-                    relationship_type='BOL'
-                )
-
-        # Upload Packing Slip to Supabase storage and create document record
-        if ps_filepath.exists():
-            with open(ps_filepath, 'rb') as f:
-                ps_file_data = f.read()
-
-            # Determine content type based on file extension
-            content_type = 'application/pdf' if ps_filename.endswith('.pdf') else 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-
-            ps_storage_path = f"{datetime.now().strftime('%Y/%m')}/{ps_filename}"
-            ps_file_url = supabase.upload_file(
-                bucket=supabase.BUCKET_GENERATED,
-                file_path=ps_storage_path,
-                file_data=ps_file_data,
+        # The generated documents belong to the PO's account
+        account_id = po_doc.get('account_id')
+        app.logger.debug("Generating documents for PO %s (%s), account %s",
+                         doc_id, po_doc.get('document_name'), account_id)
+
+        # Generated files to store: (type, filename, path, bytes, parsed data, content type).
+        # The fill step hands back the bytes it downloaded, so the export copy is not read back.
+        outputs = []
+        bol_bytes = bol_result.get('document_bytes')
+        if bol_bytes is not None or bol_filepath.exists():
+            outputs.append(('BOL', bol_filename, bol_filepath, bol_bytes,
+                            bol_result.get('bol_data'), 'application/pdf'))
+        ps_bytes = ps_result.get('document_bytes')
+        if ps_bytes is not None or ps_filepath.exists():
+            outputs.append(('PACKING_SLIP', ps_filename, ps_filepath, ps_bytes,
+                            ps_result.get('packing_slip_data'), content_type_for(ps_filename)))
+
+        month_prefix = storage_month(datetime.now())
+
+        # Upload both files to Supabase storage concurrently
+        def upload(filename, filepath, file_data, content_type):
+            storage_path = f"{month_prefix}/{filename}"
+            file_url = svc.upload_file(
+                bucket=svc.BUCKET_GENERATED,
+                file_path=storage_path,
+                file_data=file_data if file_data is not None else filepath.read_bytes(),
                 content_type=content_type
             )
+            return storage_path, file_url
+
+        uploaded = run_concurrently(**{
+            doc_type: functools.partial(upload, filename, filepath, file_data, content_type)
+            for doc_type, filename, filepath, file_data, _, content_type in outputs
+        })
+
+        # Then create both document records and link them to the original PO
+        # (document_ids are allocated by the insert)
+        app.logger.debug("Creating generated documents with account_id: %s", account_id)
+        created = svc.create_generated_documents(doc_id, [
+            {
+                'document_type': doc_type,
+                'document_name': filename,
+                'account_id': account_id,
+                'file_path': uploaded[doc_type][0],
+                'file_url': uploaded[doc_type][1],
+                'parsed_data': parsed_data,
+                'status': 'generated'
+            }
+            for doc_type, filename, _, _, parsed_data, _ in outputs
+        ])
+        app.logger.debug("Created generated documents: %s", created)
 
-            # Create Packing Slip document record
-            print(f"Creating Packing Slip document with account_id: {account_id}")
-            ps_doc = supabase.create_document(
-                document_id=ps_doc_id,
-                document_type='PACKING_SLIP',
-                document_name=ps_filename,
-                account_id=account_id,
-                file_path=ps_storage_path,
-                file_url=ps_file_url,
-                parsed_data=ps_result.get('packing_slip_data'),
-                status='generated'
-            )
-            print(f"Created Packing Slip document: {ps_doc}")
-
-            # Link Packing Slip to original PO
-            if ps_doc:
-                supabase.link_documents(
-                    po_document_id=doc_id,
-                    generated_document_id=ps_doc_id,
-                    relationship_type='PACKING_SLIP'
-                )
+        invalidate_dashboard()
+        invalidate_cache(generated_data_key(doc_id))
 
         # Show info about schema usage and generation
         messages = []
@@ -906,17 +1075,75 @@ def documents_view():
                          ps_file=ps_file)
 
 
+# Exported files are named with a generation timestamp and never rewritten, so
+# browsers may reuse them for an hour (customer documents: never in shared caches)
+EXPORT_MAX_AGE = 3600  # seconds
+
+
+def cache_privately(response, max_age):
+    """Mark a response cacheable by the requesting browser only, for max_age seconds"""
+    response.cache_control.no_cache = None  # send_file defaults to no-cache
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    return response
+
+
+def send_export(filename, **kwargs):
+    """Serve a file from the local export folder with validators for conditional GETs
+
+    Returns None when the file does not exist. send_from_directory rejects
+    names that escape the folder; the ETag is derived from mtime and size so
+    a regenerated file gets a new one.
+    """
+    try:
+        response = send_from_directory(_EXPORT_DIR, filename, conditional=False, etag=False, **kwargs)
+    except NotFound:
+        return None
+
+    st = (_EXPORT_DIR / filename).stat()
+    response.set_etag(f"{st.st_mtime_ns}-{st.st_size}")
+    response.last_modified = st.st_mtime
+    response = response.make_conditional(request)
+    return cache_privately(response, EXPORT_MAX_AGE)
+
+
 @app.route('/documents/download/<filename>')
 def documents_download(filename):
     """Download generated document from local export folder"""
-    export_dir = Path(__file__).parent.parent / 'export'
-    filepath = export_dir / filename
-
-    if not filepath.exists():
+    response = send_export(filename, as_attachment=True)
+    if response is None:
         flash('File not found', 'error')
         return redirect(url_for('index'))
+    return response
+
+
+# Size of the chunks relayed from Supabase storage to the client
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
 
-    return send_file(filepath, as_attachment=True)
+def set_content_disposition(response, disposition, filename):
+    """Set Content-Disposition the way send_file does, with an RFC 5987 name for non-ASCII filenames"""
+    try:
+        filename.encode('ascii')
+        params = {'filename': filename}
+    except UnicodeEncodeError:
+        import unicodedata
+        from urllib.parse import quote
+        params = {
+            'filename': unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii'),
+            'filename*': f"UTF-8''{quote(filename, safe='!#$&+^`|~')}",
+        }
+    response.headers.set('Content-Disposition', disposition, **params)
+
+
+def relay_validators(upstream, response):
+    """Copy the storage object's cache validators so browsers can revalidate with If-None-Match"""
+    for header in ('ETag', 'Last-Modified'):
+        if header in upstream.headers:
+            response.headers[header] = upstream.headers[header]
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
 
 
 @app.route('/documents/file/<int:doc_id>')
@@ -927,7 +1154,7 @@ def documents_file(doc_id):
         force_download = request.args.get('download') == '1'
 
         # Get document from database
-        doc = supabase.get_document(doc_id)
+        doc = _svc().get_document(doc_id)
         if not doc:
             flash('Document not found', 'error')
             return redirect(url_for('index'))
@@ -942,51 +1169,160 @@ def documents_file(doc_id):
 
         # Determine which bucket to use based on document type
         if document_type == 'PO':
-            bucket = supabase.BUCKET_UPLOADS
+            bucket = _svc().BUCKET_UPLOADS
         else:
-            bucket = supabase.BUCKET_GENERATED
+            bucket = _svc().BUCKET_GENERATED
+
+        # Let the client fetch the file straight from Supabase storage
+        if app.config['SIGNED_URL_DOWNLOADS']:
+            from .supabase_service import SupabaseError
+            try:
+                signed_url = _svc().get_signed_url(
+                    bucket, file_path,
+                    expires_in=app.config['SIGNED_URL_TTL'],
+                    download=document_name if force_download else None
+                )
+            except SupabaseError as e:
+                # Storage can still serve the bytes through the proxy below
+                app.logger.warning("Could not sign a URL for %s: %s", file_path, e)
+                signed_url = None
+            if signed_url:
+                return redirect(signed_url)
 
-        # Download file from Supabase storage
-        file_data = supabase.download_file(bucket, file_path)
+        # Otherwise stream the object from Supabase storage instead of buffering it
+        upstream = _svc().open_file_stream(bucket, file_path,
+                                           if_none_match=request.headers.get('If-None-Match'))
 
         # Determine content type based on file extension
-        if document_name.endswith('.pdf'):
-            content_type = 'application/pdf'
-        elif document_name.endswith('.xlsx'):
-            content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        elif document_name.endswith('.png'):
-            content_type = 'image/png'
-        elif document_name.endswith('.jpg') or document_name.endswith('.jpeg'):
-            content_type = 'image/jpeg'
-        else:
-            content_type = 'application/octet-stream'
-
-        # Return file as response
-        from io import BytesIO
-        return send_file(
-            BytesIO(file_data),
-            mimetype=content_type,
-            as_attachment=force_download,
-            download_name=document_name
+        content_type = content_type_for(document_name)
+
+        # Storage validated the client's cached copy: no body to relay
+        if upstream.status_code == 304:
+            upstream.close()
+            response = app.response_class(status=304)
+            relay_validators(upstream, response)
+            return response
+
+        # Relay the body in chunks as it arrives; the upstream connection goes
+        # back to the pool once the response is closed
+        response = app.response_class(
+            stream_with_context(upstream.iter_bytes(DOWNLOAD_CHUNK_SIZE)),
+            mimetype=content_type
         )
+        response.call_on_close(upstream.close)
+        set_content_disposition(response, 'attachment' if force_download else 'inline', document_name)
+        if 'content-length' in upstream.headers:
+            response.headers['Content-Length'] = upstream.headers['content-length']
+        relay_validators(upstream, response)
+        return response
 
     except Exception as e:
-        print(f"Error fetching file: {str(e)}")
+        app.logger.error("Error fetching file for document %s: %s", doc_id, e)
         flash(f'Error retrieving file: {str(e)}', 'error')
         return redirect(url_for('index'))
 
 
+# First-page PNG previews of exported PDFs (?mode=thumb), rendered once per file
+# version and kept on disk under export/.thumbs plus in a small in-memory LRU.
+# Opt-in: rendering needs pdf2image and the poppler utilities, neither of which
+# is in requirements.txt; without them ?mode=thumb serves the full PDF.
+THUMB_DPI = 72
+THUMB_CACHE_SIZE = 64
+_thumb_cache = OrderedDict()  # (filename, mtime_ns) -> PNG bytes
+_thumb_lock = threading.Lock()
+_thumbs_unavailable = False  # set once poppler turns out to be missing
+
+
+@functools.lru_cache(maxsize=1)
+def _pdf2image():
+    """The pdf2image module, or None (logged once per process) if it isn't installed"""
+    try:
+        import pdf2image
+        import pdf2image.exceptions
+    except ImportError:
+        app.logger.info("pdf2image is not installed; ?mode=thumb previews serve the full PDF")
+        return None
+    return pdf2image
+
+
+def export_thumbnail(filename):
+    """
+    Return (mtime_ns, PNG bytes) for the first page of an exported PDF.
+
+    Returns None when the file is missing, not a PDF, or cannot be rendered
+    (rendering needs the optional pdf2image package and poppler).
+    """
+    global _thumbs_unavailable
+    pdf_path = safe_join(str(_EXPORT_DIR), filename)
+    if pdf_path is None or not filename.lower().endswith('.pdf'):
+        return None
+    try:
+        mtime_ns = os.stat(pdf_path).st_mtime_ns
+    except OSError:
+        return None
+
+    key = (filename, mtime_ns)
+    with _thumb_lock:
+        png = _thumb_cache.get(key)
+        if png is not None:
+            _thumb_cache.move_to_end(key)
+            return mtime_ns, png
+
+    thumb_path = _EXPORT_DIR / '.thumbs' / f'{filename}.png'
+    try:
+        if thumb_path.stat().st_mtime_ns >= mtime_ns:
+            png = thumb_path.read_bytes()
+    except OSError:
+        pass
+
+    if png is None:
+        pdf2image = _pdf2image()
+        if pdf2image is None or _thumbs_unavailable:
+            return None
+        try:
+            page = pdf2image.convert_from_path(pdf_path, dpi=THUMB_DPI,
+                                               first_page=1, last_page=1)[0]
+        except pdf2image.exceptions.PDFInfoNotInstalledError:
+            _thumbs_unavailable = True
+            app.logger.info("poppler is not installed; ?mode=thumb previews serve the full PDF")
+            return None
+        except Exception as e:
+            app.logger.warning("Could not render thumbnail for %s: %s", filename, e)
+            return None
+        buffer = io.BytesIO()
+        page.save(buffer, format='PNG')
+        png = buffer.getvalue()
+        try:
+            ensure_dir(thumb_path.parent)
+            thumb_path.write_bytes(png)
+        except OSError:
+            pass  # Read-only filesystem: the in-memory copy still serves repeats
+
+    with _thumb_lock:
+        _thumb_cache[key] = png
+        while len(_thumb_cache) > THUMB_CACHE_SIZE:
+            _thumb_cache.popitem(last=False)
+    return mtime_ns, png
+
+
 @app.route('/documents/preview/<filename>')
 def documents_preview(filename):
-    """Preview generated document in browser"""
-    export_dir = Path(__file__).parent.parent / 'export'
-    filepath = export_dir / filename
-
-    if not filepath.exists():
+    """Preview generated document in browser (?mode=thumb for a first-page PNG)"""
+    if request.args.get('mode') == 'thumb':
+        thumb = export_thumbnail(filename)
+        if thumb is not None:
+            mtime_ns, png = thumb
+            response = make_response(png)
+            response.mimetype = 'image/png'
+            response.set_etag(f"{mtime_ns}-thumb")
+            response = response.make_conditional(request)
+            return cache_privately(response, EXPORT_MAX_AGE)
+
+    response = send_export(filename, mimetype='application/pdf')
+    if response is None:
         flash('File not found', 'error')
         return redirect(url_for('index'))
-
-    return send_file(filepath, mimetype='application/pdf')
+    return response
 
 
 # ============================================================================
@@ -996,6 +1332,7 @@ def documents_preview(filename):
 @app.route('/schemas')
 def schemas_list():
     """List all form schemas"""
+    from .backend import list_form_schemas
     schemas = list_form_schemas()
     return render_template('schemas/list.html', schemas=schemas)
 
@@ -1010,20 +1347,21 @@ def schemas_generate():
             description = request.form.get('description') or None
             
             # Get template path
-            template_dir = Path(__file__).parent.parent / 'templates'
-            template_path = template_dir / template_name
+            template_path = _TEMPLATES_DIR / template_name
             
             if not template_path.exists():
                 flash(f'Template not found: {template_name}', 'error')
                 return redirect(request.url)
             
             # Generate schema
+            from .backend import generate_form_schema_for_template
             schema_data = generate_form_schema_for_template(
                 template_path=str(template_path),
                 sample_instructions=sample_instructions,
                 description=description
             )
             
+            invalidate_dashboard()
             flash(f'Form schema generated successfully! ({schema_data["num_fields"]} fields detected)', 'success')
             return redirect(url_for('schemas_list'))
             
@@ -1031,10 +1369,9 @@ def schemas_generate():
             flash(f'Error generating schema: {str(e)}', 'error')
     
     # Get available PDF templates
-    template_dir = Path(__file__).parent.parent / 'templates'
     pdf_templates = []
-    if template_dir.exists():
-        pdf_templates = [f.name for f in template_dir.glob('*.pdf')]
+    if _TEMPLATES_DIR.exists():
+        pdf_templates = [f.name for f in _TEMPLATES_DIR.glob('*.pdf')]
     
     return render_template('schemas/generate.html', templates=pdf_templates)
 
@@ -1042,6 +1379,7 @@ def schemas_generate():
 @app.route('/schemas/<template_name>')
 def schemas_view(template_name):
     """View form schema details"""
+    from .backend import get_form_schema
     schema_data = get_form_schema(template_name)
     
     if not schema_data:
@@ -1050,13 +1388,15 @@ def schemas_view(template_name):
     
     return render_template('schemas/view.html', 
                          schema_data=schema_data,
-                         schema_json=json.dumps(schema_data['schema'], indent=2))
+                         schema_json=pretty_json(schema_data['schema']))
 
 
 @app.route('/schemas/<template_name>/delete', methods=['POST'])
 def schemas_delete(template_name):
     """Delete a form schema"""
+    from .backend import delete_form_schema
     if delete_form_schema(template_name):
+        invalidate_dashboard()
         flash('Schema deleted successfully!', 'success')
     else:
         flash('Failed to delete schema', 'error')
@@ -1067,7 +1407,9 @@ def schemas_delete(template_name):
 def schemas_setup():
     """Run the initial setup to generate schemas for all templates"""
     try:
+        from .backend import setup_form_schemas
         schemas = setup_form_schemas()
+        invalidate_dashboard()
         flash(f'Successfully generated {len(schemas)} form schemas!', 'success')
     except Exception as e:
         flash(f'Error during setup: {str(e)}', 'error')
@@ -1090,6 +1432,26 @@ def internal_error(error):
     return render_template('500.html'), 500
 
 
+# ============================================================================
+# TEMPLATE WARMUP
+# ============================================================================
+
+def warm_templates():
+    """Parse and compile every page template into the Jinja cache"""
+    from jinja2 import TemplateError
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        try:
+            app.jinja_env.get_template(name)
+        except TemplateError as e:
+            app.logger.warning("Could not precompile template %s: %s", name, e)
+
+
+# On Vercel the module is imported once per cold container, so compile templates
+# up front instead of on each page's first request
+if IS_VERCEL:
+    warm_templates()
+
+
 # ============================================================================
 # MAIN
 # ============================================================================
@@ -1,100 +1,392 @@
+import copy
+import functools
 import json
+import logging
+import operator
 import os
+import re
 import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, List
-from reducto import Reducto
-from openai import OpenAI
 import dotenv
-import openai
+import orjson
+
+
+logger = logging.getLogger(__name__)
+
+# Project directories, resolved once at import
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TEMPLATES_DIR = PROJECT_ROOT / 'templates'
+EXPORT_DIR = PROJECT_ROOT / 'export'
+
+# Schema description patterns used when prefilling Packing Slip fields
+_ROW_RE = re.compile(r"\((\d+)(?:st|nd|rd|th)\s+row")
+_TRAILING_COLON_RE = re.compile(r":\s*$")
+_WS_RE = re.compile(r"\s+")
+
+def _read_text(path) -> str:
+    """Contents of a text file (prompt templates, company context), re-read only after it changes"""
+    path = str(path)
+    return _read_text_version(path, os.stat(path).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=32)
+def _read_text_version(path: str, mtime_ns: int) -> str:
+    with open(path, 'r') as f:
+        return f.read()
+
+
+@functools.lru_cache(maxsize=8)
+def _text_wrapper(width: int):
+    """Shared word-boundary TextWrapper for a line width (fill() keeps no per-call state)"""
+    import textwrap
+    return textwrap.TextWrapper(width=width, break_long_words=False, break_on_hyphens=False)
+
+
+@functools.lru_cache(maxsize=1024)
+def _wrap_lines(text: str, width: int) -> str:
+    """Wrap each line of text longer than width at word boundaries, preserving existing line breaks"""
+    wrapper = _text_wrapper(width)
+    return '\n'.join(
+        line if len(line) <= width else wrapper.fill(line)
+        for line in text.split('\n')
+    )
+
+
+# Reducto parse block attributes (blocks are SDK objects; read with dot notation)
+_BLOCK_FIELDS = operator.attrgetter('type', 'content', 'bbox', 'confidence')
+_BBOX_FIELDS = operator.attrgetter('page', 'left', 'top', 'width', 'height')
+
+
+def _block_to_dict(block) -> Dict:
+    """Serializable dict for a Reducto parse block (missing attributes become None)"""
+    try:
+        block_type, content, bbox, confidence = _BLOCK_FIELDS(block)
+    except AttributeError:
+        block_type = getattr(block, 'type', None)
+        content = getattr(block, 'content', None)
+        bbox = getattr(block, 'bbox', None)
+        confidence = getattr(block, 'confidence', None)
+    if bbox:
+        page, left, top, width, height = _BBOX_FIELDS(bbox)
+        bbox = {"page": page, "left": left, "top": top, "width": width, "height": height}
+    else:
+        bbox = None
+    return {"type": block_type, "content": content, "bbox": bbox, "confidence": confidence}
+
+
+def _chunk_to_dict(chunk) -> Dict:
+    """Serializable dict for a Reducto parse chunk and its blocks"""
+    return {"content": chunk.content, "blocks": [_block_to_dict(block) for block in chunk.blocks]}
+
+
+# Seconds to wait on a filled-document download (connect, then each read)
+DOWNLOAD_TIMEOUT = 60
+
+
+@functools.lru_cache(maxsize=1)
+def _http_session():
+    """Shared requests session, so downloads from the same host reuse keep-alive connections"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    # Sized for the app's request threads downloading at once
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+@functools.lru_cache(maxsize=1)
+def _background_pool():
+    """Worker threads for writes nothing waits on; queued work still completes before the interpreter exits"""
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix='schema-save')
+
+
+def _store_ai_completion(store, prompt_hash: str, model: str, response: str):
+    """Store an AI completion in the shared cache, logging rather than raising on failure"""
+    try:
+        store.store_ai_completion(prompt_hash, model, response)
+    except Exception as e:
+        logger.warning("⚠ Could not store AI completion: %s", e)
+
+
+def _save_form_schema(supabase, template_name: str, **kwargs):
+    """Save a generated form schema to Supabase, logging rather than raising on failure"""
+    try:
+        supabase.save_form_schema(template_name=template_name, **kwargs)
+        logger.info("✓ Saved form schema to Supabase: %s", template_name)
+    except Exception as e:
+        logger.warning("⚠ Warning: Could not save form schema: %s", e)
+
+
+@functools.lru_cache(maxsize=1024)
+def _canonical_field_key(description: str) -> str:
+    """
+    Convert schema description into a canonical key for matching.
+    Example: "ORDER DATE:. Date the order was placed..." -> "ORDER DATE"
+             "SHIP TO: Company Name:. ..." -> "SHIP TO: COMPANY NAME"
+
+    Memoized: saved schemas are reused across fills, so each description is
+    canonicalized once per process.
+    """
+    head = (description or "").strip().split(".", 1)[0].strip()
+    # Remove trailing colon(s)
+    head = _TRAILING_COLON_RE.sub("", head)
+    # Normalize whitespace + uppercase
+    head = _WS_RE.sub(" ", head).upper()
+    return head
+
+
+# Address sub-fields -> address keys (None: the combined city/state/zip line)
+_ADDRESS_SUBFIELDS = {
+    "COMPANY NAME": "name",
+    "STREET ADDRESS": "address",
+    "CITY/STATE/ZIP CODE": None,
+    "COUNTRY": "country",
+}
+
+# Packing Slip order-info row: (fill_data key, schema label), in form order
+_ORDER_INFO_FIELDS = (
+    ("order_date", "ORDER DATE"),
+    ("order_number", "ORDER #"),
+    ("purchase_order_number", "PURCHASE ORDER #"),
+    ("customer_contact", "CUSTOMER CONTACT"),
+)
+
+# Instruction-line tables for Client._field_lines: (key, line template, kind).
+# _TEXT lines need a truthy value, _COUNT lines any value but None (0 is a real
+# count), and _WRAP lines are _TEXT lines whose value is word-wrapped first
+_TEXT, _COUNT, _WRAP = 'text', 'count', 'wrap'
+
+_PACKING_SLIP_HEADER_LINES = (
+    ('date', "DATE field (date format): {}", _TEXT),
+    ('customer_id', "CUSTOMER ID field (text): {}", _TEXT),
+    ('salesperson', "SALESPERSON field (text): {}", _TEXT),
+)
+
+_PACKING_SLIP_ITEM_LINES = (
+    ('item_number', "  ITEM # (product code): {}", _TEXT),
+    ('description', "  DESCRIPTION (product name): {}", _WRAP),
+    ('order_qty', "  ORDER QTY (numeric quantity only): {}", _COUNT),
+    ('ship_qty', "  SHIP QTY (numeric quantity only): {}", _COUNT),
+)
+
+_BOL_HEADER_LINES = (
+    ('bol_number', "BOL NUMBER (digits only): {}", _TEXT),
+    ('bol_date', "BOL DATE (YYYY-MM-DD): {}", _TEXT),
+    ('carrier_name', "CARRIER NAME: {}", _TEXT),
+)
+
+_BOL_ADDRESS_LINES = (
+    ('name', "  Company: {}", _TEXT),
+    ('address', "  Address: {}", _TEXT),
+)
+
+_BOL_PRODUCT_LINES = (
+    ('name', "    Name (text): {}", _TEXT),
+    ('description', "    Description (text): {}", _WRAP),
+    ('item_number', "    Item Number (text/code): {}", _TEXT),
+    ('un_code', "    UN Code (text): {}", _TEXT),
+)
+
+_BOL_HANDLING_UNIT_LINES = (
+    ('quantity', "    Handling Unit Quantity (integer count only): {}", _COUNT),
+    ('type', "    Handling Unit Type (IBC/Drum/Pallet/Box text only): {}", _TEXT),
+)
+
+_BOL_PACKAGE_LINES = (
+    ('quantity', "    Package/Weight Quantity (numeric only): {}", _COUNT),
+    ('type', "    Package/Weight Unit (kg/lb text only): {}", _TEXT),
+)
+
+_BOL_ORDER_LINES = (
+    ('customer_id', "    Customer ID (text): {}", _TEXT),
+    ('po_number', "    PO Number (text): {}", _TEXT),
+    ('sales_order_number', "    Sales Order Number (digits/text): {}", _TEXT),
+    ('material_name', "    Material Name (text): {}", _TEXT),
+    ('num_packages', "    Number of Packages (integer count only): {}", _COUNT),
+    ('weight', "    Weight (numeric only): {}", _COUNT),
+    ('weight_unit', "    Weight Unit (kg/lb text only): {}", _TEXT),
+    ('country_of_origin', "    Country of Origin (text): {}", _TEXT),
+    ('customer_po', "    Customer PO (text): {}", _TEXT),
+    ('additional_shipper_info', "    Additional Shipper Info (text): {}", _WRAP),
+)
+
+# Row names the Packing Slip schema uses for its line-item rows
+_ROW_LABELS = ('1st', '2nd', '3rd', '4th', '5th', '6th', '7th', '8th', '9th', '10th', '11th', '12th')
+
+# Line-item columns -> item keys
+_LINE_ITEM_COLUMNS = {
+    "ITEM #": "item_number",
+    "DESCRIPTION": "description",
+    "ORDER QTY": "order_qty",
+    "SHIP QTY": "ship_qty",
+}
 
 
 class DocumentStore:
     
     def __init__(self, db_path: str = "db.json"):
         self.db_path = db_path
+        # Parsed db.json, reused until the file's mtime or size changes
+        self._db: Optional[Dict] = None
+        self._db_mtime = 0
+        self._db_size = 0
+        # Lookups into the cached documents list (first document wins, as in a scan)
+        self._by_name: Dict[str, Dict] = {}
+        self._by_id: Dict[int, Dict] = {}
+        self._next_id = 1
+        # Inside batch(), saves only mark the cached dict dirty; it is written once at the end
+        self._batch_depth = 0
+        self._dirty = False
         self._ensure_db_exists()
     
     def _ensure_db_exists(self):
         if not os.path.exists(self.db_path):
-            with open(self.db_path, 'w') as f:
-                json.dump({
+            with open(self.db_path, 'wb') as f:
+                f.write(orjson.dumps({
                     "documents": [],
-                    "form_schemas": {}
-                }, f, indent=2)
+                    "form_schemas": {},
+                    "next_id": 1
+                }, option=orjson.OPT_INDENT_2))
     
     def _load_db(self) -> Dict:
-        with open(self.db_path, 'r') as f:
-            data = json.load(f)
-            # Handle old format (list) and migrate to new format (dict)
-            if isinstance(data, list):
-                return {"documents": data, "form_schemas": {}}
-            return data
+        st = os.stat(self.db_path)
+        if self._db is not None and (st.st_mtime_ns, st.st_size) == (self._db_mtime, self._db_size):
+            return self._db
+
+        with open(self.db_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            data = orjson.loads(f.read())
+        # Handle old format (list) and migrate to new format (dict)
+        if isinstance(data, list):
+            data = {"documents": data, "form_schemas": {}}
+        self._index_documents(data)
+        self._cache_db(data, st)
+        return data
     
     def _save_db(self, data: Dict):
-        with open(self.db_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        # Methods below keep the indexes current as they edit the cached dict
+        if data is not self._db:
+            self._index_documents(data)
+            self._db = data
+        self._dirty = True
+        if not self._batch_depth:
+            self.flush()
+
+    def flush(self):
+        """Write pending changes to db.json (atomically, via a temp file and rename)"""
+        if not self._dirty:
+            return
+        buffer = orjson.dumps(self._db, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        with tempfile.NamedTemporaryFile('wb', dir=directory, prefix='.db-', suffix='.tmp',
+                                         delete=False) as f:
+            f.write(buffer)
+            f.flush()
+            try:
+                # Temp files are created 0600; keep db.json's existing permissions
+                os.fchmod(f.fileno(), os.stat(self.db_path).st_mode & 0o777)
+            except (AttributeError, OSError):  # no fchmod on older Windows Pythons
+                pass
+            st = os.fstat(f.fileno())
+        os.replace(f.name, self.db_path)
+        self._cache_db(self._db, st)
+        self._dirty = False
+
+    @contextmanager
+    def batch(self):
+        """Coalesce the writes made inside the block into a single save of db.json"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush()
+
+    def _index_documents(self, data: Dict):
+        """Rebuild the name and id lookups and the next free document id for data"""
+        self._by_name = {}
+        self._by_id = {}
+        max_id = 0
+        for doc in data.get("documents", []):
+            self._by_name.setdefault(doc.get('document_name'), doc)
+            self._by_id.setdefault(doc.get('document_id'), doc)
+            max_id = max(max_id, doc.get('document_id') or 0)
+        self._next_id = max(data.get("next_id", 0), max_id + 1)
+
+    def _cache_db(self, data: Dict, st: os.stat_result):
+        """Keep data as the parsed contents of db.json as of the given stat"""
+        self._db = data
+        self._db_mtime = st.st_mtime_ns
+        self._db_size = st.st_size
     
+    # The cached dict outlives each call, so documents and schemas are copied on the
+    # way in and out; callers may edit what they pass or get back without changing
+    # the store (or having the edit persisted by the next save)
+
     def get_document_by_name(self, document_name: str) -> Optional[Dict]:
-        db = self._load_db()
-        documents = db.get("documents", [])
-        for doc in documents:
-            if doc.get('document_name') == document_name:
-                return doc
-        return None
+        self._load_db()
+        return copy.deepcopy(self._by_name.get(document_name))
     
     def get_document_by_id(self, document_id: int) -> Optional[Dict]:
-        db = self._load_db()
-        documents = db.get("documents", [])
-        for doc in documents:
-            if doc.get('document_id') == document_id:
-                return doc
-        return None
+        self._load_db()
+        return copy.deepcopy(self._by_id.get(document_id))
     
     def add_document(self, document_name: str, file_id: str, result_json: Dict, 
                      studio_link: str = "", document_type: str = "PO") -> Dict:
         db = self._load_db()
-        documents = db.get("documents", [])
-        
+
         # Generate new document ID
-        new_id = max([doc.get('document_id', 0) for doc in documents], default=0) + 1
+        new_id = self._next_id
+        self._next_id += 1
+        db["next_id"] = self._next_id
         
+        now = datetime.now().isoformat()
         new_doc = {
             "document_id": new_id,
             "document_name": document_name,
             "file_id": file_id,
-            "result_json": result_json,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
+            "result_json": copy.deepcopy(result_json),
+            "created_at": now,
+            "updated_at": now,
             "studio_link": studio_link,
             "document_type": document_type
         }
         
-        documents.append(new_doc)
-        db["documents"] = documents
+        db.setdefault("documents", []).append(new_doc)
+        self._by_name.setdefault(document_name, new_doc)
+        self._by_id.setdefault(new_id, new_doc)
         self._save_db(db)
-        return new_doc
+        return copy.deepcopy(new_doc)
     
     def update_document(self, document_id: int, **kwargs) -> Optional[Dict]:
         db = self._load_db()
-        documents = db.get("documents", [])
-        
-        for i, doc in enumerate(documents):
-            if doc.get('document_id') == document_id:
-                doc['updated_at'] = datetime.now().isoformat()
-                for key, value in kwargs.items():
-                    if key in doc:
-                        doc[key] = value
-                documents[i] = doc
-                db["documents"] = documents
-                self._save_db(db)
-                return doc
+
+        # doc is the stored dict itself, so updating it in place updates db
+        doc = self._by_id.get(document_id)
+        if doc is not None:
+            doc['updated_at'] = datetime.now().isoformat()
+            for key, value in kwargs.items():
+                if key in doc:
+                    doc[key] = copy.deepcopy(value)
+            if 'document_name' in kwargs:
+                self._index_documents(db)
+            self._save_db(db)
+            return copy.deepcopy(doc)
         return None
     
     def list_all_documents(self) -> List[Dict]:
         db = self._load_db()
-        return db.get("documents", [])
+        return copy.deepcopy(db.get("documents", []))
     
     def document_exists(self, document_name: str) -> bool:
         return self.get_document_by_name(document_name) is not None
@@ -107,34 +399,33 @@ class DocumentStore:
                          template_file_id: str = None, description: str = None) -> Dict:
         """Save a form schema for a template"""
         db = self._load_db()
-        schemas = db.get("form_schemas", {})
-        
+
+        now = datetime.now().isoformat()
         schema_data = {
             "template_name": template_name,
-            "schema": schema,
+            "schema": copy.deepcopy(schema),
             "template_file_id": template_file_id,
             "description": description,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
+            "created_at": now,
+            "updated_at": now,
             "num_fields": len(schema)
         }
         
-        schemas[template_name] = schema_data
-        db["form_schemas"] = schemas
+        db.setdefault("form_schemas", {})[template_name] = schema_data
         self._save_db(db)
-        return schema_data
+        return copy.deepcopy(schema_data)
     
     def get_form_schema(self, template_name: str) -> Optional[Dict]:
         """Get form schema for a template"""
         db = self._load_db()
         schemas = db.get("form_schemas", {})
-        return schemas.get(template_name)
+        return copy.deepcopy(schemas.get(template_name))
     
     def list_form_schemas(self) -> List[Dict]:
         """List all form schemas"""
         db = self._load_db()
         schemas = db.get("form_schemas", {})
-        return list(schemas.values())
+        return copy.deepcopy(list(schemas.values()))
     
     def delete_form_schema(self, template_name: str) -> bool:
         """Delete a form schema"""
@@ -143,15 +434,23 @@ class DocumentStore:
         
         if template_name in schemas:
             del schemas[template_name]
-            db["form_schemas"] = schemas
             self._save_db(db)
             return True
         return False
 
 
 class Client:
-    
-    def __init__(self, reducto_api_key: Optional[str] = None, openai_api_key: Optional[str] = None):
+
+    # AI completions kept per client, keyed by a hash of the model and full prompt
+    AI_CACHE_SIZE = 64
+
+    def __init__(self, reducto_api_key: Optional[str] = None, openai_api_key: Optional[str] = None,
+                 completion_store=None):
+        # The Reducto and OpenAI SDKs are slow to import, so only load them once a
+        # parser is actually needed (not for schema listing or document lookups)
+        from reducto import Reducto
+        import openai
+
         dotenv.load_dotenv()
         self.reducto_api_key = reducto_api_key or os.getenv("REDUCTO_API_KEY")
         if not self.reducto_api_key:
@@ -161,16 +460,29 @@ class Client:
         if not self.engine:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
         self.model = "gpt-5-2025-08-07"
+        # Stream completions until the API says this account can't stream the model
+        self.stream_completions = True
+        self._bad_request_error = getattr(openai, 'BadRequestError', ())
+
+        # Raw JSON text of recent completions; re-parsed on every hit so callers
+        # can modify the returned dict freely
+        self._ai_results: "OrderedDict[str, str]" = OrderedDict()
+        self._ai_lock = threading.Lock()
+        # Shared completion cache behind the in-process one (a SupabaseService with
+        # get_ai_completion / store_ai_completion), so other workers and instances
+        # reuse completions too; None for local-only runs
+        self.completion_store = completion_store
     
-    def upload_file(self, file_path: Path):
+    def upload_file(self, file_path: Path, file_data: Optional[bytes] = None):
         try:
-            upload = self.client.upload(file=file_path)
-            print(f"✓ Uploaded: {file_path.name}")
+            # In-memory content is sent as (filename, bytes) without touching disk
+            upload = self.client.upload(file=(file_path.name, file_data) if file_data is not None else file_path)
+            logger.info("✓ Uploaded: %s", file_path.name)
             # The upload object is returned directly by Reducto
             # We'll extract file_id in process_document if needed
             return upload
         except Exception as e:
-            print(f"✗ Error uploading {file_path.name}: {str(e)}")
+            logger.error("✗ Error uploading %s: %s", file_path.name, e)
             raise
             
     def fill_document_with_ai(self, template_path: str, parsed_po_data: Dict, 
@@ -191,22 +503,20 @@ class Client:
         if not template_path.exists():
             raise FileNotFoundError(f"Template not found: {template_path}")
         
-        with open(template_path, 'r') as f:
-            template_prompt = f.read()
+        template_prompt = _read_text(template_path)
         
-        print(f"✓ Loaded template prompt from: {template_path}")
-        print(f"  Template size: {len(template_prompt)} characters")
+        logger.info("✓ Loaded template prompt from: %s", template_path)
+        logger.info("  Template size: %s characters", len(template_prompt))
         
         # Load company context
         context_path = Path('templates/HansonChemicals.txt')
         if not context_path.exists():
-            context_path = Path(__file__).parent.parent / 'templates' / 'HansonChemicals.txt'
+            context_path = TEMPLATES_DIR / 'HansonChemicals.txt'
         
-        with open(context_path, 'r') as f:
-            company_context = f.read()
+        company_context = _read_text(context_path)
         
-        print(f"✓ Loaded company context from: {context_path}")
-        print(f"  Context size: {len(company_context)} characters")
+        logger.info("✓ Loaded company context from: %s", context_path)
+        logger.info("  Context size: %s characters", len(company_context))
         
         # Extract text content from parsed PO
         po_text = self._extract_text_from_parsed_data(parsed_po_data)
@@ -231,31 +541,94 @@ Here is the Purchase Order data to process:
 
 Please extract the information and return ONLY a valid JSON object matching the {document_type} structure specified in the template. Do not include any explanatory text, markdown formatting, or code blocks - just the raw JSON."""
         
+        # The same PO content, template, context and date always produce the same
+        # prompt; reuse the earlier completion instead of another API call
+        prompt_hash = hashlib.sha256(
+            f"{self.model}\0{system_message}\0{user_message}".encode('utf-8')
+        ).hexdigest()
+        with self._ai_lock:
+            cached_text = self._ai_results.get(prompt_hash)
+            if cached_text is not None:
+                self._ai_results.move_to_end(prompt_hash)
+        if cached_text is None and self.completion_store is not None:
+            try:
+                cached_text = self.completion_store.get_ai_completion(prompt_hash)
+            except Exception as e:
+                # Non-fatal; generate it instead
+                logger.warning("⚠ Could not read the AI completion cache: %s", e)
+            if cached_text is not None:
+                self._remember_completion(prompt_hash, cached_text)
+        if cached_text is not None:
+            logger.info("✓ Reusing %s generated earlier for identical PO content", document_type)
+            return orjson.loads(cached_text)
+
         # Call OpenAI API
         try:
-            response = self.engine.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_message}
-                ],
-                response_format={"type": "json_object"}  # Force JSON output
-            )
-            
-            result_text = response.choices[0].message.content
-            result_json = json.loads(result_text)
+            result_text = self._complete_json([
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": user_message}
+            ])
+            result_json = orjson.loads(result_text)
+
+            self._remember_completion(prompt_hash, result_text)
+            if self.completion_store is not None:
+                # The caller doesn't need the shared copy, so don't wait on it
+                _background_pool().submit(_store_ai_completion, self.completion_store,
+                                          prompt_hash, self.model, result_text)
             
-            print(f"✓ Successfully generated {document_type} using AI")
+            logger.info("✓ Successfully generated %s using AI", document_type)
             return result_json
             
-        except json.JSONDecodeError as e:
-            print(f"✗ Error parsing AI response as JSON: {str(e)}")
-            print(f"Raw response: {result_text}")
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses it
+            logger.error("✗ Error parsing AI response as JSON: %s", e)
+            logger.error("Raw response: %s", result_text)
             raise
         except Exception as e:
-            print(f"✗ Error calling OpenAI API: {str(e)}")
+            logger.error("✗ Error calling OpenAI API: %s", e)
             raise
     
+    def _remember_completion(self, prompt_hash: str, result_text: str):
+        """Keep a completion's text in the in-process LRU"""
+        with self._ai_lock:
+            self._ai_results[prompt_hash] = result_text
+            self._ai_results.move_to_end(prompt_hash)
+            while len(self._ai_results) > self.AI_CACHE_SIZE:
+                self._ai_results.popitem(last=False)
+
+    def _complete_json(self, messages: List[Dict]) -> str:
+        """
+        Run a JSON-mode chat completion and return the reply text
+
+        The reply is streamed so tokens arrive as they are generated rather than
+        after a long idle wait. If the account may not stream this model, the
+        client falls back to a single blocking request from then on.
+
+        Args:
+            messages: Chat messages to send
+
+        Returns:
+            The complete reply text
+        """
+        request = dict(model=self.model, messages=messages,
+                       response_format={"type": "json_object"})  # Force JSON output
+        if self.stream_completions:
+            try:
+                parts = []
+                for chunk in self.engine.chat.completions.create(stream=True, **request):
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                return ''.join(parts)
+            except self._bad_request_error as e:
+                # Only a 400 about the stream parameter itself means streaming isn't allowed
+                # (e.g. unverified organizations); anything else would fail unstreamed too
+                if getattr(e, 'param', None) != 'stream':
+                    raise
+                logger.warning("⚠ Streaming unavailable for %s, using blocking requests: %s", self.model, e)
+                self.stream_completions = False
+
+        response = self.engine.chat.completions.create(**request)
+        return response.choices[0].message.content
+
     def _extract_text_from_parsed_data(self, parsed_data: Dict) -> str:
         """
         Extract readable text from parsed document data
@@ -269,11 +642,11 @@ Please extract the information and return ONLY a valid JSON object matching the
         if not parsed_data or 'chunks' not in parsed_data:
             return ""
         
-        text_parts = []
-        for chunk in parsed_data.get('chunks', []):
-            content = chunk.get('content', '')
-            if content.strip():
-                text_parts.append(content)
+        # isspace() tests for blank chunks without building a stripped copy of each
+        text_parts = [
+            content for chunk in parsed_data['chunks'] or []
+            if (content := chunk.get('content', '')) and not content.isspace()
+        ]
         
         return "\n\n".join(text_parts)
     
@@ -312,12 +685,12 @@ Please extract the information and return ONLY a valid JSON object matching the
                 save_path.parent.mkdir(parents=True, exist_ok=True)
                 with open(save_path, 'w') as f:
                     json.dump(schema_dicts, f, indent=2)
-                print(f"✓ Saved form schema to: {save_path}")
+                logger.info("✓ Saved form schema to: %s", save_path)
             
             return schema_dicts
             
         except Exception as e:
-            print(f"✗ Error generating form schema: {str(e)}")
+            logger.error("✗ Error generating form schema: %s", e)
             raise
     
     def fill_template_document(self, template_file_id: str, fill_data: Dict,
@@ -337,7 +710,8 @@ Please extract the information and return ONLY a valid JSON object matching the
             template_name: Optional template name for saving generated schema
 
         Returns:
-            Dictionary with document_url and optionally generated_schema
+            Dictionary with document_url, the downloaded document_bytes (when
+            save_path is given) and optionally generated_schema
         """
         # Convert fill_data to natural language instructions
         instructions = self._data_to_instructions(fill_data)
@@ -352,6 +726,9 @@ Please extract the information and return ONLY a valid JSON object matching the
 
             # If caller didn't pass a schema but we have a template_name, try to load the saved schema
             # from Supabase. This prevents "No schema provided" runs which are inconsistent.
+            # The service is resolved once here and reused if the generated schema is saved below;
+            # the import stays local so the supabase SDK is only loaded when a template needs it.
+            supabase = None
             if (not form_schema) and template_name:
                 try:
                     from .supabase_service import get_supabase_service
@@ -359,10 +736,10 @@ Please extract the information and return ONLY a valid JSON object matching the
                     schema_data = supabase.get_form_schema(template_name)
                     if schema_data and schema_data.get("schema"):
                         form_schema = schema_data.get("schema")
-                        print(f"✓ Loaded form schema from Supabase in fill_template_document ({schema_data.get('num_fields')} fields)")
+                        logger.info("✓ Loaded form schema from Supabase in fill_template_document (%s fields)", schema_data.get('num_fields'))
                 except Exception as e:
                     # Non-fatal; we'll fall back to detection
-                    print(f"⚠ Could not load form schema from Supabase in fill_template_document: {e}")
+                    logger.warning("⚠ Could not load form schema from Supabase in fill_template_document: %s", e)
 
             # Call Reducto Edit API
             if form_schema:
@@ -372,7 +749,7 @@ Please extract the information and return ONLY a valid JSON object matching the
                 if template_name and template_name.lower() == "packingslip_template.pdf":
                     form_schema = self._prefill_packing_slip_form_schema(form_schema, fill_data)
 
-                print(f"✓ Using existing form schema ({len(form_schema)} fields)")
+                logger.info("✓ Using existing form schema (%s fields)", len(form_schema))
                 result = self.client.edit.run(
                     document_url=template_file_id,
                     edit_instructions=instructions,
@@ -381,7 +758,7 @@ Please extract the information and return ONLY a valid JSON object matching the
                 )
                 generated_schema = None
             else:
-                print(f"⚠ No schema provided - Reducto will detect fields (slower)")
+                logger.warning("⚠ No schema provided - Reducto will detect fields (slower)")
                 result = self.client.edit.run(
                     document_url=template_file_id,
                     edit_instructions=instructions,
@@ -397,39 +774,44 @@ Please extract the information and return ONLY a valid JSON object matching the
                     else:
                         generated_schema = result.form_schema
 
-                    print(f"✓ Generated form schema with {len(generated_schema)} fields")
+                    logger.info("✓ Generated form schema with %s fields", len(generated_schema))
 
                     # Save schema if template name provided
                     if template_name:
                         try:
-                            from .supabase_service import get_supabase_service
-                            supabase = get_supabase_service()
-                            supabase.save_form_schema(
+                            if supabase is None:
+                                from .supabase_service import get_supabase_service
+                                supabase = get_supabase_service()
+                            # The filled document doesn't depend on the save, so don't wait on it
+                            _background_pool().submit(
+                                _save_form_schema,
+                                supabase,
                                 template_name=template_name,
                                 schema=generated_schema,
                                 template_file_id=template_file_id,
                                 description=f"Auto-generated schema from first run"
                             )
-                            print(f"✓ Saved form schema to Supabase: {template_name}")
                         except Exception as e:
-                            print(f"⚠ Warning: Could not save form schema: {str(e)}")
+                            logger.warning("⚠ Warning: Could not save form schema: %s", e)
 
             document_url = result.document_url
-            print(f"✓ Document filled successfully")
-            print(f"  Credits used: {result.usage.credits if hasattr(result, 'usage') else 'N/A'}")
+            logger.info("✓ Document filled successfully")
+            logger.info("  Credits used: %s", result.usage.credits if hasattr(result, 'usage') else 'N/A')
 
             # Download and save if path provided
+            document_bytes = None
             if save_path and document_url:
-                self._download_document(document_url, save_path)
+                document_bytes = self._download_document(document_url, save_path)
 
             return {
                 'document_url': document_url,
+                'document_bytes': document_bytes,
                 'generated_schema': generated_schema,
                 'used_existing_schema': form_schema is not None
             }
 
         except Exception as e:
-            print(f"✗ Error filling template: {str(e)}")
+            logger.error("✗ Error filling template: %s", e)
             raise
 
     def _prefill_packing_slip_form_schema(self, form_schema: List[Dict], fill_data: Dict) -> List[Dict]:
@@ -437,10 +819,9 @@ Please extract the information and return ONLY a valid JSON object matching the
         Prefill Packing Slip schema fields by matching on schema 'description' prefixes.
         This makes critical fields deterministic (no LLM guessing), especially the blue order-info row.
         """
-        import copy
-        import re
-
-        schema = copy.deepcopy(form_schema)
+        # Only each field's "value" is assigned below, so copying the field dicts is
+        # enough to leave the caller's (possibly cached) schema untouched
+        schema = [dict(field) for field in form_schema]
 
         def as_str(v):
             if v is None:
@@ -478,12 +859,35 @@ Please extract the information and return ONLY a valid JSON object matching the
 
         items = fill_data.get("items") or []
 
+        # Flat address table, built once: (section, subfield) -> value
+        address_values = {}
+        for section, address, city_state_zip in (
+            ("SHIP FROM", ship_from, ship_from_city_state_zip),
+            ("SHIP TO", ship_to, ship_city_state_zip),
+            ("BILL TO", bill_to, bill_city_state_zip),
+        ):
+            for sub, address_key in _ADDRESS_SUBFIELDS.items():
+                address_values[section, sub] = city_state_zip if address_key is None else as_str(address.get(address_key))
+
+        # An empty Bill To blanks every field in its block, known subfield or not
+        blank_sections = () if has_bill_to else ("BILL TO",)
+
+        # Flat line-item table: (column, 1-based row) -> value; rows past the end stay blank
+        line_item_values = {
+            (column, row_num): as_str((item or {}).get(item_key))
+            for row_num, item in enumerate(items, 1)
+            for column, item_key in _LINE_ITEM_COLUMNS.items()
+        }
+
+        # Header and order-info fields take their value straight from one table
+        simple_values = {**header_values, **order_info_values}
+
         # Track whether we successfully matched critical order-row fields (debug)
         matched_order = {k: False for k in order_info_values.keys()}
 
         def extract_row_num(desc: str) -> int | None:
             # Examples: "(1st row shown)", "(2nd row shown)", "(12th row/last listed)"
-            m = re.search(r"\((\d+)(st|nd|rd|th)\s+row", desc)
+            m = _ROW_RE.search(desc)
             if not m:
                 return None
             try:
@@ -491,101 +895,48 @@ Please extract the information and return ONLY a valid JSON object matching the
             except Exception:
                 return None
 
-        def canonical_field_key(description: str) -> str:
-            """
-            Convert schema description into a canonical key for matching.
-            Example: "ORDER DATE:. Date the order was placed..." -> "ORDER DATE"
-                     "SHIP TO: Company Name:. ..." -> "SHIP TO: COMPANY NAME"
-            """
-            head = (description or "").strip().split(".", 1)[0].strip()
-            # Remove trailing colon(s)
-            head = re.sub(r":\s*$", "", head)
-            # Normalize whitespace + uppercase
-            head = re.sub(r"\s+", " ", head).upper()
-            return head
-
         for field in schema:
             desc = (field.get("description") or "").strip()
             if not desc:
                 continue
 
-            key = canonical_field_key(desc)
+            key = _canonical_field_key(desc)
 
-            # Simple header fields
-            if key in header_values:
-                field["value"] = header_values[key]
+            # Simple header fields and the order info row (critical): one lookup
+            value = simple_values.get(key)
+            if value is not None:
+                field["value"] = value
+                if key in matched_order:
+                    matched_order[key] = True
                 continue
 
-            # Order info row (critical)
-            if key in order_info_values:
-                field["value"] = order_info_values[key]
-                matched_order[key] = True
-                continue
-
-            # Address subfields
-            if key.startswith("SHIP FROM:"):
-                sub = key.replace("SHIP FROM:", "", 1).strip()
-                if sub in ("COMPANY NAME", "COMPANY NAME:"):
-                    field["value"] = as_str(ship_from.get("name"))
-                elif sub in ("STREET ADDRESS", "STREET ADDRESS:"):
-                    field["value"] = as_str(ship_from.get("address"))
-                elif sub in ("CITY/STATE/ZIP CODE", "CITY/STATE/ZIP CODE:"):
-                    field["value"] = ship_from_city_state_zip
-                elif sub in ("COUNTRY", "COUNTRY:"):
-                    field["value"] = as_str(ship_from.get("country"))
-                continue
-
-            if key.startswith("SHIP TO:"):
-                sub = key.replace("SHIP TO:", "", 1).strip()
-                if sub in ("COMPANY NAME", "COMPANY NAME:"):
-                    field["value"] = as_str(ship_to.get("name"))
-                elif sub in ("STREET ADDRESS", "STREET ADDRESS:"):
-                    field["value"] = as_str(ship_to.get("address"))
-                elif sub in ("CITY/STATE/ZIP CODE", "CITY/STATE/ZIP CODE:"):
-                    field["value"] = ship_city_state_zip
-                elif sub in ("COUNTRY", "COUNTRY:"):
-                    field["value"] = as_str(ship_to.get("country"))
-                continue
-
-            if key.startswith("BILL TO:"):
-                sub = key.replace("BILL TO:", "", 1).strip()
-                if not has_bill_to:
+            # Address subfields: "SHIP FROM: ...", "SHIP TO: ...", "BILL TO: ..."
+            section, colon, sub = key.partition(":")
+            if colon and section in ("SHIP FROM", "SHIP TO", "BILL TO"):
+                if section in blank_sections:
                     field["value"] = ""
                     continue
-                if sub in ("COMPANY NAME", "COMPANY NAME:"):
-                    field["value"] = as_str(bill_to.get("name"))
-                elif sub in ("STREET ADDRESS", "STREET ADDRESS:"):
-                    field["value"] = as_str(bill_to.get("address"))
-                elif sub in ("CITY/STATE/ZIP CODE", "CITY/STATE/ZIP CODE:"):
-                    field["value"] = bill_city_state_zip
-                elif sub in ("COUNTRY", "COUNTRY:"):
-                    field["value"] = as_str(bill_to.get("country"))
+                sub = sub.strip()
+                if sub.endswith(":"):
+                    sub = sub[:-1]
+                value = address_values.get((section, sub))
+                if value is not None:
+                    field["value"] = value
                 continue
 
-            # Line items (row-specific)
-            if key.startswith("ITEM # (LINE ITEM)") or key.startswith("DESCRIPTION (LINE ITEM)") or key.startswith("ORDER QTY (LINE ITEM)") or key.startswith("SHIP QTY (LINE ITEM)"):
+            # Line items (row-specific): "ITEM # (LINE ITEM) ...", "SHIP QTY (LINE ITEM) ...", etc.
+            column, marker, _ = key.partition(" (LINE ITEM)")
+            if marker and column in _LINE_ITEM_COLUMNS:
                 row_num = extract_row_num(desc)
                 if not row_num:
                     continue
-                idx = row_num - 1
-                if idx < 0 or idx >= len(items):
-                    field["value"] = ""
-                    continue
-                item = items[idx] or {}
-                if key.startswith("ITEM # (LINE ITEM)"):
-                    field["value"] = as_str(item.get("item_number"))
-                elif key.startswith("DESCRIPTION (LINE ITEM)"):
-                    field["value"] = as_str(item.get("description"))
-                elif key.startswith("ORDER QTY (LINE ITEM)"):
-                    field["value"] = as_str(item.get("order_qty"))
-                elif key.startswith("SHIP QTY (LINE ITEM)"):
-                    field["value"] = as_str(item.get("ship_qty"))
+                field["value"] = line_item_values.get((column, row_num), "")
 
         # Debug: if schema didn't match those order-info fields, log it so we can fix schema text patterns.
         # This is the #1 reason they stay blank even though the data exists.
         missing = [k for k, ok in matched_order.items() if not ok and order_info_values.get(k)]
         if missing:
-            print(f"⚠ PackingSlip schema prefill: could not match order-info fields in schema: {missing}")
+            logger.warning("⚠ PackingSlip schema prefill: could not match order-info fields in schema: %s", missing)
 
         return schema
     
@@ -600,24 +951,11 @@ Please extract the information and return ONLY a valid JSON object matching the
         Returns:
             Text with line breaks added
         """
-        if not text or len(str(text)) <= width:
-            return str(text)
-
-        import textwrap
-        # Wrap text at word boundaries, preserving existing line breaks
         text = str(text)
-        lines = text.split('\n')
-        wrapped_lines = []
-
-        for line in lines:
-            if len(line) <= width:
-                wrapped_lines.append(line)
-            else:
-                # Wrap long lines
-                wrapped = textwrap.fill(line, width=width, break_long_words=False, break_on_hyphens=False)
-                wrapped_lines.append(wrapped)
-
-        return '\n'.join(wrapped_lines)
+        if len(text) <= width:
+            return text
+        # Descriptions repeat across items and regenerations, so wraps are memoized
+        return _wrap_lines(text, width)
 
     def _data_to_instructions(self, data: Dict) -> str:
         """
@@ -640,248 +978,127 @@ Please extract the information and return ONLY a valid JSON object matching the
         """
         Generate instructions for Packing Slip that match the form schema exactly
         """
-        instructions = []
-        instructions.append("Fill this Packing Slip form with the following information:")
-        instructions.append("")
-        
-        # HEADER SECTION - Match schema descriptions exactly
-        instructions.append("HEADER SECTION (top right corner):")
-        if data.get('date'):
-            instructions.append(f"DATE field (date format): {data['date']}")
-        
-        if data.get('customer_id'):
-            instructions.append(f"CUSTOMER ID field (text): {data['customer_id']}")
-        
-        if data.get('salesperson'):
-            instructions.append(f"SALESPERSON field (text): {data['salesperson']}")
-        
-        instructions.append("")
+        instructions = [
+            "Fill this Packing Slip form with the following information:",
+            "",
+            # HEADER SECTION - Match schema descriptions exactly
+            "HEADER SECTION (top right corner):",
+        ]
+        instructions.extend(self._field_lines(data, _PACKING_SLIP_HEADER_LINES))
         
         # BILL TO SECTION
-        instructions.append("BILL TO SECTION:")
+        instructions.extend(("", "BILL TO SECTION:"))
         bill_to = data.get('bill_to')
         if bill_to and isinstance(bill_to, dict) and any(bill_to.values()):
-            if bill_to.get('name'):
-                instructions.append(f"BILL TO: Company Name: {bill_to['name']}")
-            if bill_to.get('address'):
-                instructions.append(f"BILL TO: Street Address: {bill_to['address']}")
-            city = bill_to.get('city', '')
-            state = bill_to.get('state', '')
-            zip_code = bill_to.get('zip_code', '')
-            if city or state or zip_code:
-                instructions.append(f"BILL TO: City/State/Zip Code: {city} {state} {zip_code}".strip())
-            if bill_to.get('country'):
-                instructions.append(f"BILL TO: Country: {bill_to['country']}")
+            instructions.extend(self._address_instructions("BILL TO", bill_to))
         else:
             instructions.append("Leave all BILL TO fields blank")
         
-        instructions.append("")
-        
         # SHIP FROM SECTION
-        instructions.append("SHIP FROM SECTION:")
+        instructions.extend(("", "SHIP FROM SECTION:"))
         ship_from = data.get('ship_from')
         if ship_from and isinstance(ship_from, dict):
-            if ship_from.get('name'):
-                instructions.append(f"SHIP FROM: Company Name: {ship_from['name']}")
-            if ship_from.get('address'):
-                instructions.append(f"SHIP FROM: Street Address: {ship_from['address']}")
-            city = ship_from.get('city', '')
-            state = ship_from.get('state', '')
-            zip_code = ship_from.get('zip_code', '')
-            if city or state or zip_code:
-                instructions.append(f"SHIP FROM: City/State/Zip Code: {city} {state} {zip_code}".strip())
-            if ship_from.get('country'):
-                instructions.append(f"SHIP FROM: Country: {ship_from['country']}")
-        
-        instructions.append("")
+            instructions.extend(self._address_instructions("SHIP FROM", ship_from))
         
         # SHIP TO SECTION - This should always be filled
-        instructions.append("SHIP TO SECTION:")
+        instructions.extend(("", "SHIP TO SECTION:"))
         ship_to = data.get('ship_to')
         if ship_to and isinstance(ship_to, dict):
-            if ship_to.get('name'):
-                instructions.append(f"SHIP TO: Company Name: {ship_to['name']}")
-            if ship_to.get('address'):
-                instructions.append(f"SHIP TO: Street Address: {ship_to['address']}")
-            city = ship_to.get('city', '')
-            state = ship_to.get('state', '')
-            zip_code = ship_to.get('zip_code', '')
-            if city or state or zip_code:
-                instructions.append(f"SHIP TO: City/State/Zip Code: {city} {state} {zip_code}".strip())
-            if ship_to.get('country'):
-                instructions.append(f"SHIP TO: Country: {ship_to['country']}")
-        
-        instructions.append("")
+            instructions.extend(self._address_instructions("SHIP TO", ship_to))
         
         # ORDER INFORMATION ROW - Always include all fields explicitly
-        instructions.append("ORDER INFORMATION ROW (below SHIP TO section):")
-        
-        # ORDER DATE field
-        order_date = data.get('order_date', '')
-        if order_date:
-            instructions.append(f"Fill ORDER DATE field with: {order_date}")
-        else:
-            instructions.append(f"ORDER DATE: Leave blank")
-        
-        # ORDER # field
-        order_number = data.get('order_number', '')
-        if order_number:
-            instructions.append(f"Fill ORDER # field with: {order_number}")
-        else:
-            instructions.append(f"ORDER #: Leave blank")
-        
-        # PURCHASE ORDER # field
-        po_number = data.get('purchase_order_number', '')
-        if po_number:
-            instructions.append(f"Fill PURCHASE ORDER # field with: {po_number}")
-        else:
-            instructions.append(f"PURCHASE ORDER #: Leave blank")
-        
-        # CUSTOMER CONTACT field
-        customer_contact = data.get('customer_contact', '')
-        if customer_contact:
-            instructions.append(f"Fill CUSTOMER CONTACT field with: {customer_contact}")
-        else:
-            instructions.append(f"CUSTOMER CONTACT: Leave blank")
-        
-        instructions.append("")
+        instructions.extend(("", "ORDER INFORMATION ROW (below SHIP TO section):"))
+        for key, label in _ORDER_INFO_FIELDS:
+            value = data.get(key, '')
+            instructions.append(f"Fill {label} field with: {value}" if value else f"{label}: Leave blank")
         
         # LINE ITEMS - Match schema row descriptions
-        instructions.append("LINE ITEMS TABLE (columns: ITEM #, DESCRIPTION, ORDER QTY, SHIP QTY):")
+        instructions.extend(("", "LINE ITEMS TABLE (columns: ITEM #, DESCRIPTION, ORDER QTY, SHIP QTY):"))
         items = data.get('items', [])
         
-        row_labels = ['1st', '2nd', '3rd', '4th', '5th', '6th', '7th', '8th', '9th', '10th', '11th', '12th']
-        
         for idx, item in enumerate(items):
-            if idx < len(row_labels):
-                row_label = row_labels[idx]
-            else:
-                row_label = f"{idx + 1}th"
-            
-            instructions.append(f"Line item ({row_label} row):")
-            
-            if item.get('item_number'):
-                instructions.append(f"  ITEM # (product code): {item['item_number']}")
-            
-            if item.get('description'):
-                desc = self._wrap_text(item['description'], width=60)
-                instructions.append(f"  DESCRIPTION (product name): {desc}")
-            
-            if item.get('order_qty') is not None:
-                instructions.append(f"  ORDER QTY (numeric quantity only): {item['order_qty']}")
-            
-            if item.get('ship_qty') is not None:
-                instructions.append(f"  SHIP QTY (numeric quantity only): {item['ship_qty']}")
-            
-            instructions.append("")
+            row_label = _ROW_LABELS[idx] if idx < len(_ROW_LABELS) else f"{idx + 1}th"
+            # One entry per item: its heading, present fields and a trailing blank line
+            instructions.append("\n".join([
+                f"Line item ({row_label} row):",
+                *self._field_lines(item, _PACKING_SLIP_ITEM_LINES),
+                "",
+            ]))
         
         # TOTAL
         if data.get('total'):
             instructions.append(f"TOTAL: {data['total']}")
         
         return "\n".join(instructions)
+
+    @staticmethod
+    def _address_instructions(label: str, address: Dict) -> List[str]:
+        """
+        Packing Slip instruction lines for one address block
+
+        Args:
+            label: Section name as the schema spells it (e.g. "SHIP TO")
+            address: Address dict with name, address, city, state, zip_code and country
+
+        Returns:
+            One line per non-empty subfield
+        """
+        lines = []
+        if address.get('name'):
+            lines.append(f"{label}: Company Name: {address['name']}")
+        if address.get('address'):
+            lines.append(f"{label}: Street Address: {address['address']}")
+        city = address.get('city', '')
+        state = address.get('state', '')
+        zip_code = address.get('zip_code', '')
+        if city or state or zip_code:
+            lines.append(f"{label}: City/State/Zip Code: {city} {state} {zip_code}".strip())
+        if address.get('country'):
+            lines.append(f"{label}: Country: {address['country']}")
+        return lines
     
     def _bol_instructions(self, data: Dict) -> str:
         """
         Generate instructions for BOL
         """
-        instructions = []
-        instructions.append("Fill this Bill of Lading with the following information:")
-        instructions.append("")
+        instructions = ["Fill this Bill of Lading with the following information:", ""]
         
-        # BOL Header
-        if data.get('bol_number'):
-            instructions.append(f"BOL NUMBER (digits only): {data['bol_number']}")
-        if data.get('bol_date'):
-            instructions.append(f"BOL DATE (YYYY-MM-DD): {data['bol_date']}")
+        # BOL Header and Carrier
+        instructions.extend(self._field_lines(data, _BOL_HEADER_LINES))
         
-        # Carrier
-        if data.get('carrier_name'):
-            instructions.append(f"CARRIER NAME: {data['carrier_name']}")
-        
-        # Ship From
-        ship_from = data.get('ship_from')
-        if ship_from:
-            instructions.append("")
-            instructions.append("SHIP FROM:")
-            if ship_from.get('name'):
-                instructions.append(f"  Company: {ship_from['name']}")
-            if ship_from.get('address'):
-                instructions.append(f"  Address: {ship_from['address']}")
-            city_state_zip = f"{ship_from.get('city', '')} {ship_from.get('state', '')} {ship_from.get('zip_code', '')}".strip()
-            if city_state_zip:
-                instructions.append(f"  City/State/Zip: {city_state_zip}")
-        
-        # Ship To
-        ship_to = data.get('ship_to')
-        if ship_to:
-            instructions.append("")
-            instructions.append("SHIP TO:")
-            if ship_to.get('name'):
-                instructions.append(f"  Company: {ship_to['name']}")
-            if ship_to.get('address'):
-                instructions.append(f"  Address: {ship_to['address']}")
-            city_state_zip = f"{ship_to.get('city', '')} {ship_to.get('state', '')} {ship_to.get('zip_code', '')}".strip()
-            if city_state_zip:
-                instructions.append(f"  City/State/Zip: {city_state_zip}")
+        # Ship From / Ship To
+        for section, key in (("SHIP FROM:", 'ship_from'), ("SHIP TO:", 'ship_to')):
+            address = data.get(key)
+            if address:
+                instructions.extend(("", section))
+                instructions.extend(self._field_lines(address, _BOL_ADDRESS_LINES))
+                city_state_zip = f"{address.get('city', '')} {address.get('state', '')} {address.get('zip_code', '')}".strip()
+                if city_state_zip:
+                    instructions.append(f"  City/State/Zip: {city_state_zip}")
         
         # Products
         products = data.get('products', [])
         if products:
-            instructions.append("")
-            instructions.append("PRODUCTS (be strict about types: counts vs weights vs units):")
+            instructions.extend(("", "PRODUCTS (be strict about types: counts vs weights vs units):"))
             for i, product in enumerate(products, 1):
                 instructions.append(f"  Product {i}:")
-                if product.get('name'):
-                    instructions.append(f"    Name (text): {product['name']}")
-                if product.get('description'):
-                    instructions.append(f"    Description (text): {self._wrap_text(product['description'], width=60)}")
-                if product.get('item_number'):
-                    instructions.append(f"    Item Number (text/code): {product['item_number']}")
-                if product.get('un_code'):
-                    instructions.append(f"    UN Code (text): {product['un_code']}")
+                instructions.extend(self._field_lines(product, _BOL_PRODUCT_LINES))
                 handling = product.get('handling_unit') or {}
                 if isinstance(handling, dict):
-                    if handling.get('quantity') is not None:
-                        instructions.append(f"    Handling Unit Quantity (integer count only): {handling.get('quantity')}")
-                    if handling.get('type'):
-                        instructions.append(f"    Handling Unit Type (IBC/Drum/Pallet/Box text only): {handling.get('type')}")
+                    instructions.extend(self._field_lines(handling, _BOL_HANDLING_UNIT_LINES))
                 pkg = product.get('package') or {}
                 if isinstance(pkg, dict):
-                    if pkg.get('quantity') is not None:
-                        instructions.append(f"    Package/Weight Quantity (numeric only): {pkg.get('quantity')}")
-                    if pkg.get('type'):
-                        instructions.append(f"    Package/Weight Unit (kg/lb text only): {pkg.get('type')}")
+                    instructions.extend(self._field_lines(pkg, _BOL_PACKAGE_LINES))
                 if product.get('weight') is not None:
                     instructions.append(f"    Total Weight (numeric only): {product.get('weight')}")
 
         # Orders (table-like fields) — this is where column swaps usually happen
         orders = data.get('orders', [])
         if orders:
-            instructions.append("")
-            instructions.append("ORDERS (be strict: counts are integers; weights are numbers; units are separate):")
+            instructions.extend(("", "ORDERS (be strict: counts are integers; weights are numbers; units are separate):"))
             for i, order in enumerate(orders, 1):
                 instructions.append(f"  Order {i}:")
-                if order.get('customer_id'):
-                    instructions.append(f"    Customer ID (text): {order.get('customer_id')}")
-                if order.get('po_number'):
-                    instructions.append(f"    PO Number (text): {order.get('po_number')}")
-                if order.get('sales_order_number'):
-                    instructions.append(f"    Sales Order Number (digits/text): {order.get('sales_order_number')}")
-                if order.get('material_name'):
-                    instructions.append(f"    Material Name (text): {order.get('material_name')}")
-                if order.get('num_packages') is not None:
-                    instructions.append(f"    Number of Packages (integer count only): {order.get('num_packages')}")
-                if order.get('weight') is not None:
-                    instructions.append(f"    Weight (numeric only): {order.get('weight')}")
-                if order.get('weight_unit'):
-                    instructions.append(f"    Weight Unit (kg/lb text only): {order.get('weight_unit')}")
-                if order.get('country_of_origin'):
-                    instructions.append(f"    Country of Origin (text): {order.get('country_of_origin')}")
-                if order.get('customer_po'):
-                    instructions.append(f"    Customer PO (text): {order.get('customer_po')}")
-                if order.get('additional_shipper_info'):
-                    instructions.append(f"    Additional Shipper Info (text): {self._wrap_text(order.get('additional_shipper_info'), width=60)}")
+                instructions.extend(self._field_lines(order, _BOL_ORDER_LINES))
         
         # Special Instructions
         if data.get('special_instructions'):
@@ -890,36 +1107,63 @@ Please extract the information and return ONLY a valid JSON object matching the
             instructions.append(f"SPECIAL INSTRUCTIONS: {wrapped}")
         
         return "\n".join(instructions)
+
+    def _field_lines(self, source: Dict, fields) -> List[str]:
+        """
+        Instruction lines for the fields of source that have a value
+
+        Args:
+            source: Dict the values are read from
+            fields: (key, line template, kind) triples; see _TEXT, _COUNT and _WRAP
+
+        Returns:
+            One formatted line per present field, in table order
+        """
+        lines = []
+        for key, template, kind in fields:
+            value = source.get(key)
+            if kind is _COUNT:
+                if value is None:
+                    continue
+            elif not value:
+                continue
+            elif kind is _WRAP:
+                value = self._wrap_text(value, width=60)
+            lines.append(template.format(value))
+        return lines
     
     def _generic_instructions(self, data: Dict) -> str:
         """
         Fallback generic instructions
         """
-        instructions = []
-        instructions.append("Fill this form with the following information:")
-        instructions.append("")
-        
-        def process_dict(d, prefix=""):
-            for key, value in d.items():
-                field_name = key.replace('_', ' ').title()
-                full_key = f"{prefix}{field_name}" if prefix else field_name
+        instructions = ["Fill this form with the following information:", ""]
+        
+        # Depth-first walk with an explicit stack of (items iterator, key prefix), so
+        # nested dicts and lists of dicts cost no Python frames and keep their order
+        stack = [(iter(data.items()), "")]
+        while stack:
+            items, prefix = stack[-1]
+            for key, value in items:
+                full_key = prefix + key.replace('_', ' ').title()
                 
                 if isinstance(value, dict):
-                    process_dict(value, f"{full_key} - ")
+                    stack.append((iter(value.items()), f"{full_key} - "))
+                    break
                 elif isinstance(value, list):
                     if value and isinstance(value[0], dict):
-                        for i, item in enumerate(value, 1):
-                            process_dict(item, f"{full_key} {i} - ")
-                    else:
-                        value_str = ', '.join(str(v) for v in value) if value else ''
-                        instructions.append(f"{full_key}: {value_str}")
+                        # Pushed last-first so item 1 is walked first
+                        for i in range(len(value), 0, -1):
+                            stack.append((iter(value[i - 1].items()), f"{full_key} {i} - "))
+                        break
+                    value_str = ', '.join(str(v) for v in value) if value else ''
+                    instructions.append(f"{full_key}: {value_str}")
+                elif value is None:
+                    instructions.append(f"{full_key}: [Leave blank]")
                 else:
-                    if value is None:
-                        instructions.append(f"{full_key}: [Leave blank]")
-                    else:
-                        instructions.append(f"{full_key}: {value}")
+                    instructions.append(f"{full_key}: {value}")
+            else:
+                stack.pop()
         
-        process_dict(data)
         return "\n".join(instructions)
     
     def _download_document(self, url: str, save_path: str):
@@ -929,88 +1173,115 @@ Please extract the information and return ONLY a valid JSON object matching the
         Args:
             url: URL of the document
             save_path: Local path to save the document
+
+        Returns:
+            The downloaded document bytes (as written to save_path)
         """
-        import requests
-        
         try:
             save_path = Path(save_path)
             save_path.parent.mkdir(parents=True, exist_ok=True)
             
-            response = requests.get(url)
-            response.raise_for_status()
+            with _http_session().get(url, timeout=DOWNLOAD_TIMEOUT) as response:
+                response.raise_for_status()
+                content = response.content
             
             with open(save_path, 'wb') as f:
-                f.write(response.content)
+                f.write(content)
             
-            print(f"✓ Downloaded document to: {save_path}")
+            logger.info("✓ Downloaded document to: %s", save_path)
+            return content
             
         except Exception as e:
-            print(f"✗ Error downloading document: {str(e)}")
+            logger.error("✗ Error downloading document: %s", e)
             raise
 
 
     def parse_file(self, upload) -> Dict:
         try:
-            result = self.client.parse.run(
-                input=upload,
-                formatting={
-                    "table_output_format": "json"
-                }
-            )
-            
-            print(f"✓ Parsed document successfully")
-            print(f"  Job ID: {result.job_id}")
-            print(f"  Pages processed: {result.usage.num_pages}")
-            print(f"  Credits used: {result.usage.credits}")
-            print(f"  Number of chunks: {len(result.result.chunks)}")
-            
-            # Convert chunks to serializable format
-            chunks_data = []
-            for chunk in result.result.chunks:
-                chunk_dict = {
-                    "content": chunk.content,
-                    "blocks": []
-                }
-                
-                # Convert blocks to dicts
-                for block in chunk.blocks:
-                    # Access block attributes using dot notation (Reducto objects)
-                    block_dict = {
-                        "type": block.type if hasattr(block, 'type') else None,
-                        "content": block.content if hasattr(block, 'content') else None,
-                        "bbox": {
-                            "page": block.bbox.page,
-                            "left": block.bbox.left,
-                            "top": block.bbox.top,
-                            "width": block.bbox.width,
-                            "height": block.bbox.height
-                        } if hasattr(block, 'bbox') and block.bbox else None,
-                        "confidence": block.confidence if hasattr(block, 'confidence') else None
-                    }
-                    chunk_dict["blocks"].append(block_dict)
-                
-                chunks_data.append(chunk_dict)
+            result = self._run_parse(upload)
             
             # Return structured data
             parsed_data = {
-                "job_id": result.job_id,
-                "duration": result.duration if hasattr(result, 'duration') else None,
-                "usage": {
-                    "num_pages": result.usage.num_pages,
-                    "credits": result.usage.credits
-                },
-                "chunks": chunks_data,
+                **self._parse_header(result),
+                # Convert chunks to serializable format
+                "chunks": [_chunk_to_dict(chunk) for chunk in result.result.chunks],
                 "studio_link": result.studio_link
             }
             
             return parsed_data
         except Exception as e:
-            print(f"✗ Error parsing document: {str(e)}")
+            logger.error("✗ Error parsing document: %s", e)
             raise
 
+    def parse_file_to_json(self, upload, json_path) -> Dict:
+        """
+        Parse an uploaded file and write the result to a JSON file
+
+        Writes the same JSON as parse_file's result, but serializes the chunks one
+        at a time instead of building the whole list first, so a large document is
+        never held as both the chunk list and its JSON at once.
+
+        Args:
+            upload: Upload returned by upload_file
+            json_path: File to write the parse result to
+
+        Returns:
+            The parse result without its chunks (job_id, duration, usage, studio_link)
+        """
+        try:
+            result = self._run_parse(upload)
+            header = self._parse_header(result)
+            with open(json_path, 'wb') as f:
+                # Same key order as parse_file: the header keys, chunks, then studio_link
+                f.write(orjson.dumps(header)[:-1] + b',"chunks":[')
+                for i, chunk in enumerate(result.result.chunks):
+                    if i:
+                        f.write(b',')
+                    f.write(orjson.dumps(_chunk_to_dict(chunk)))
+                f.write(b'],"studio_link":%s}' % orjson.dumps(result.studio_link))
+
+            logger.info("✓ Wrote parse result to: %s", json_path)
+            return {**header, "studio_link": result.studio_link}
+        except Exception as e:
+            logger.error("✗ Error parsing document: %s", e)
+            raise
+
+    @staticmethod
+    def _parse_header(result) -> Dict:
+        """job_id, duration and usage of a Reducto parse result"""
+        return {
+            "job_id": result.job_id,
+            "duration": result.duration if hasattr(result, 'duration') else None,
+            "usage": {
+                "num_pages": result.usage.num_pages,
+                "credits": result.usage.credits
+            },
+        }
+
+    def _run_parse(self, upload):
+        """Run a Reducto parse of an uploaded file (tables as JSON) and log its usage"""
+        result = self.client.parse.run(
+            input=upload,
+            formatting={
+                "table_output_format": "json"
+            }
+        )
+        
+        logger.info("✓ Parsed document successfully")
+        logger.info("  Job ID: %s", result.job_id)
+        logger.info("  Pages processed: %s", result.usage.num_pages)
+        logger.info("  Credits used: %s", result.usage.credits)
+        logger.info("  Number of chunks: %s", len(result.result.chunks))
+        return result
+
 
 class DocumentManager:
 
+    # Parse results kept per manager, keyed by file content hash
+    PARSE_CACHE_SIZE = 32
+    # Concurrent uploads/parses in process_documents (kept low for Reducto's rate limit)
+    BATCH_WORKERS = 4
+
     def __init__(self, db_path: str = None, use_supabase: bool = True):
         """
         Initialize DocumentManager with Supabase or local storage
@@ -1019,54 +1290,165 @@ class DocumentManager:
             db_path: Path to local db.json (deprecated, kept for backwards compatibility)
             use_supabase: If True, use Supabase for storage (default). Set to False to use local JSON.
         """
-        from .supabase_service import get_supabase_service
-
         self.use_supabase = use_supabase
+        self._supabase = None  # Connected on first use (see the supabase property)
 
         if use_supabase:
-            self.supabase = get_supabase_service()
             self.store = None  # Deprecated, kept for compatibility
         else:
             # Fallback to local storage (deprecated)
             if db_path is None:
-                db_path = Path(__file__).parent.parent / "db.json"
+                db_path = PROJECT_ROOT / "db.json"
             self.store = DocumentStore(str(db_path))
-            self.supabase = None
 
         self.parser = None
+        self._parser_lock = threading.Lock()
+
+        # content sha256 -> (file_id, result_json, studio_link). Only spans this
+        # process (CLI runs, batches); po_upload first checks documents.content_hash
+        self._parsed_by_hash = OrderedDict()
+        self._parse_lock = threading.Lock()
+
+    @property
+    def supabase(self):
+        """Supabase service, created on first access so constructing a manager does no I/O"""
+        if self._supabase is None and self.use_supabase:
+            from .supabase_service import get_supabase_service
+            self._supabase = get_supabase_service()
+        return self._supabase
 
     def _init_parser(self):
         if self.parser is None:
-            self.parser = Client()
+            # po_review generates the BOL and Packing Slip on separate threads; build one Client
+            with self._parser_lock:
+                if self.parser is None:
+                    # In Supabase mode, AI completions are shared through the ai_completions table
+                    self.parser = Client(completion_store=self.supabase if self.use_supabase else None)
+
+    @staticmethod
+    def _file_digest(file_path: Path) -> str:
+        """SHA-256 of a file's contents, read in 1MB chunks"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _remember_parse(self, content_hash: str, parsed: tuple):
+        """Keep a parse result for content_hash, evicting the oldest beyond PARSE_CACHE_SIZE"""
+        with self._parse_lock:
+            self._parsed_by_hash[content_hash] = parsed
+            while len(self._parsed_by_hash) > self.PARSE_CACHE_SIZE:
+                self._parsed_by_hash.popitem(last=False)
     
     def process_document(self, file_path: str, document_type: str = "PO",
-                        force_reparse: bool = False) -> Dict:
+                        force_reparse: bool = False, file_data: Optional[bytes] = None) -> Dict:
+        """
+        Parse a document (or reuse an earlier parse) and record it
+
+        Args:
+            file_path: Path of the document; only its name is used when file_data is given
+            document_type: Type stored with the document
+            force_reparse: Parse again even if the document was already parsed
+            file_data: Document content already in memory (skips reading file_path)
+
+        Returns:
+            The document record (in Supabase mode, the data for app.py to create it)
+        """
 
         file_path = Path(file_path)
         document_name = file_path.name
 
-        # Check if document exists (using Supabase or local store)
+        existing_doc = self._existing_document(document_name)
+        if existing_doc and not force_reparse:
+            self._log_existing(existing_doc)
+            return existing_doc
+
+        parsed = self._parse_document(file_path, file_data, force_reparse)
+        return self._record_document(document_name, existing_doc, parsed, document_type)
+
+    def process_documents(self, file_paths: List[str], document_type: str = "PO",
+                          force_reparse: bool = False, max_workers: int = None) -> List[Dict]:
+        """
+        Process several documents, uploading and parsing them concurrently
+
+        Parsing is network-bound and independent per file, so it runs on a thread pool;
+        the documents are then recorded one at a time, in order, as process_document would.
+
+        Args:
+            file_paths: Paths of the documents
+            document_type: Type stored with each document
+            force_reparse: Parse again even if a document was already parsed
+            max_workers: Concurrent parses (default: BATCH_WORKERS)
+
+        Returns:
+            The document records, in the order of file_paths
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        file_paths = [Path(p) for p in file_paths]
+        existing = [self._existing_document(p.name) for p in file_paths]
+        pending = [p for p, doc in zip(file_paths, existing) if force_reparse or not doc]
+
+        parsed = {}
+        if pending:
+            workers = min(max_workers or self.BATCH_WORKERS, len(pending))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='parse') as pool:
+                results = pool.map(lambda p: self._parse_document(p, None, force_reparse), pending)
+                parsed = dict(zip(pending, results))
+
+        documents = []
+        # Records are created by the caller, so reserve this batch's Supabase ids up front
+        new_ids = iter(self.supabase.allocate_document_ids(len(parsed)) if self.use_supabase else ())
+        # Locally, write db.json once for the whole batch rather than once per document
+        with (nullcontext() if self.use_supabase else self.store.batch()):
+            for file_path, existing_doc in zip(file_paths, existing):
+                if file_path not in parsed:
+                    self._log_existing(existing_doc)
+                    documents.append(existing_doc)
+                    continue
+                documents.append(self._record_document(file_path.name, existing_doc, parsed[file_path],
+                                                       document_type, next(new_ids, None)))
+        return documents
+
+    def _existing_document(self, document_name: str) -> Optional[Dict]:
+        """Document already recorded under document_name, if any"""
         if self.use_supabase:
-            # Search for existing document by name in Supabase
-            docs = self.supabase.list_documents()
-            existing_doc = None
-            for doc in docs:
-                if doc.get('document_name') == document_name:
-                    existing_doc = doc
-                    break
+            return self.supabase.get_document_by_name(document_name)
+        return self.store.get_document_by_name(document_name)
+
+    @staticmethod
+    def _log_existing(existing_doc: Dict):
+        logger.info("  Document '%s' already parsed. Using cached version.", existing_doc.get('document_name'))
+        logger.info("  Document ID: %s", existing_doc['document_id'])
+        logger.info("  Parsed on: %s", existing_doc.get('created_at', 'N/A'))
+
+    def _parse_document(self, file_path: Path, file_data: Optional[bytes] = None,
+                        force_reparse: bool = False) -> tuple:
+        """
+        Upload and parse a document, or reuse an earlier parse of the same content
+
+        Returns:
+            (file_id, result_json, studio_link)
+        """
+        document_name = file_path.name
+
+        # Re-uploads of a byte-identical file reuse the earlier parse instead of
+        # going back to Reducto (file names differ per upload, contents don't)
+        if file_data is not None:
+            content_hash = hashlib.sha256(file_data).hexdigest()
         else:
-            existing_doc = self.store.get_document_by_name(document_name)
+            content_hash = self._file_digest(file_path)
+        parsed = None if force_reparse else self._parsed_by_hash.get(content_hash)
 
-        if existing_doc and not force_reparse:
-            print(f"  Document '{document_name}' already parsed. Using cached version.")
-            print(f"  Document ID: {existing_doc['document_id']}")
-            print(f"  Parsed on: {existing_doc.get('created_at', 'N/A')}")
-            return existing_doc
+        if parsed:
+            logger.info("  '%s' matches a file already parsed (sha256 %s). Reusing parse result.", document_name, content_hash[:12])
+            return parsed
 
-        print(f"\n📄 Processing: {document_name}")
+        logger.info("\n📄 Processing: %s", document_name)
         self._init_parser()
 
-        upload = self.parser.upload_file(file_path)
+        upload = self.parser.upload_file(file_path, file_data)
         result = self.parser.parse_file(upload)
 
         # Extract file_id from upload object (it could be the object itself or have a file_id attribute)
@@ -1078,14 +1460,33 @@ class DocumentManager:
             file_id = str(upload) if upload else ''
 
         studio_link = result.get('studio_link', '')
-        result_json = result
+        parsed = (file_id, result, studio_link)
+        self._remember_parse(content_hash, parsed)
+        return parsed
+
+    def _record_document(self, document_name: str, existing_doc: Optional[Dict], parsed: tuple,
+                         document_type: str, document_id: int = None) -> Dict:
+        """
+        Record a parse as a new document, or as an update of existing_doc
+
+        Args:
+            document_name: Name to record the document under
+            existing_doc: Document already recorded under that name (being re-parsed), if any
+            parsed: (file_id, result_json, studio_link) from _parse_document
+            document_type: Type stored with the document
+            document_id: Id for a new Supabase document (default: a newly reserved one)
 
-        if existing_doc and force_reparse:
-            print(f"Updating existing document (ID: {existing_doc.get('document_id') or existing_doc.get('id')})")
+        Returns:
+            The document record (in Supabase mode, the data for app.py to create it)
+        """
+        file_id, result_json, studio_link = parsed
+
+        if existing_doc:
+            logger.info("Updating existing document (ID: %s)", existing_doc.get('document_id') or existing_doc.get('id'))
             if self.use_supabase:
                 # Supabase doesn't support updating via document_id for this method
                 # We need to create a new document instead
-                print(f"Warning: Supabase mode doesn't support force_reparse. Creating new document.")
+                logger.warning("Warning: Supabase mode doesn't support force_reparse. Creating new document.")
                 # Fall through to create new document
             else:
                 updated_doc = self.store.update_document(
@@ -1097,12 +1498,10 @@ class DocumentManager:
                 return updated_doc
 
         # Create new document
-        print(f"Adding new document to database")
+        logger.info("Adding new document to database")
         if self.use_supabase:
-            # Generate document_id (max existing + 1)
-            all_docs = self.supabase.list_documents()
-            max_id = max([doc.get('document_id', 0) for doc in all_docs], default=0)
-            new_doc_id = max_id + 1
+            # Reserve a document_id from the database sequence
+            new_doc_id = document_id or self.supabase.allocate_document_ids(1)[0]
 
             # Return document data - app.py will create the Supabase record
             return {
@@ -1129,12 +1528,7 @@ class DocumentManager:
             if document_id:
                 doc = self.supabase.get_document(document_id)
             else:
-                # Search by name - less efficient but works
-                docs = self.supabase.list_documents()
-                for d in docs:
-                    if d.get('document_name') == document_name:
-                        doc = d
-                        break
+                doc = self.supabase.get_document_by_name(document_name)
 
             # Normalize field names: Supabase uses 'parsed_data', but code expects 'result_json'
             if doc and 'parsed_data' in doc and 'result_json' not in doc:
@@ -1270,7 +1664,7 @@ class DocumentManager:
             raise ValueError(f"Purchase Order has no parsed data")
         
         # Get template path
-        template_path = Path(__file__).parent.parent / 'templates' / 'BOL_Template.txt'
+        template_path = TEMPLATES_DIR / 'BOL_Template.txt'
         if not template_path.exists():
             template_path = Path('templates/BOL_Template.txt')
         
@@ -1289,7 +1683,7 @@ class DocumentManager:
             if self.use_supabase:
                 # When using Supabase, we don't save intermediate JSON data
                 # Only final filled PDFs are saved via app.py
-                print(f"⚠ Warning: save_to_db not supported with Supabase (JSON data not persisted)")
+                logger.warning("⚠ Warning: save_to_db not supported with Supabase (JSON data not persisted)")
             else:
                 self.store.add_document(
                     document_name=bol_name,
@@ -1298,7 +1692,7 @@ class DocumentManager:
                     studio_link="",
                     document_type="BOL"
                 )
-                print(f"✓ Saved generated BOL as: {bol_name}")
+                logger.info("✓ Saved generated BOL as: %s", bol_name)
         
         return bol_data
     
@@ -1329,7 +1723,7 @@ class DocumentManager:
             raise ValueError(f"Purchase Order has no parsed data")
         
         # Get template path
-        template_path = Path(__file__).parent.parent / 'templates' / 'PackingSlip_Template.txt'
+        template_path = TEMPLATES_DIR / 'PackingSlip_Template.txt'
         if not template_path.exists():
             template_path = Path('templates/PackingSlip_Template.txt')
         
@@ -1348,7 +1742,7 @@ class DocumentManager:
             if self.use_supabase:
                 # When using Supabase, we don't save intermediate JSON data
                 # Only final filled PDFs are saved via app.py
-                print(f"⚠ Warning: save_to_db not supported with Supabase (JSON data not persisted)")
+                logger.warning("⚠ Warning: save_to_db not supported with Supabase (JSON data not persisted)")
             else:
                 self.store.add_document(
                     document_name=ps_name,
@@ -1357,7 +1751,7 @@ class DocumentManager:
                     studio_link="",
                     document_type="PackingSlip"
                 )
-                print(f"✓ Saved generated Packing Slip as: {ps_name}")
+                logger.info("✓ Saved generated Packing Slip as: %s", ps_name)
         
         return packing_slip_data
     
@@ -1369,7 +1763,8 @@ class DocumentManager:
                              output_filename: str = None,
                              address_overrides: Dict = None,
                              bol_number_override: str = None,
-                             bol_data: Dict = None) -> Dict:
+                             bol_data: Dict = None,
+                             po_doc: Dict = None) -> Dict:
         """
         Generate BOL data from PO and fill the BOL template
         
@@ -1383,45 +1778,46 @@ class DocumentManager:
             address_overrides: Dictionary with 'ship_from' and/or 'ship_to' address overrides
             bol_number_override: Custom BOL number to use instead of AI-generated one
             bol_data: Pre-generated BOL data (if provided, skips AI generation)
+            po_doc: Already-fetched PO document (if provided, skips the lookup)
         
         Returns:
-            Dictionary with BOL data and filled document URL
+            Dictionary with BOL data, filled document URL and the PO document used
         """
         self._init_parser()
         
         # Get PO document
-        po_doc = self.get_document(po_document_name, po_document_id)
+        po_doc = po_doc or self.get_document(po_document_name, po_document_id)
         if not po_doc:
             raise ValueError(f"Purchase Order not found")
         
         # Generate BOL data only if not provided
         if bol_data is None:
-            print("📋 Generating BOL data from Purchase Order...")
+            logger.info("📋 Generating BOL data from Purchase Order...")
             bol_data = self.generate_bol_from_po(po_document_name, po_document_id, save_to_db=True)
         else:
-            print("📋 Using pre-generated BOL data (skipping AI call)")
+            logger.info("📋 Using pre-generated BOL data (skipping AI call)")
         
         # Apply address overrides if provided
         if address_overrides:
             if 'ship_from' in address_overrides:
                 bol_data['ship_from'] = address_overrides['ship_from']
-                print(f"✓ Applied ship_from address override: {address_overrides['ship_from'].get('name')}")
+                logger.info("✓ Applied ship_from address override: %s", address_overrides['ship_from'].get('name'))
             if 'ship_to' in address_overrides:
                 bol_data['ship_to'] = address_overrides['ship_to']
-                print(f"✓ Applied ship_to address override: {address_overrides['ship_to'].get('name')}")
+                logger.info("✓ Applied ship_to address override: %s", address_overrides['ship_to'].get('name'))
         
         # Apply BOL number override if provided
         if bol_number_override:
             bol_data['bol_number'] = bol_number_override
-            print(f"✓ Applied BOL number override: {bol_number_override}")
+            logger.info("✓ Applied BOL number override: %s", bol_number_override)
         
         # Get or upload template
         if not bol_template_file_id:
-            template_path = Path(__file__).parent.parent / 'templates' / 'BOL_Template.pdf'
+            template_path = TEMPLATES_DIR / 'BOL_Template.pdf'
             if not template_path.exists():
                 raise FileNotFoundError(f"BOL template not found at {template_path}")
             
-            print(f"📤 Uploading BOL template...")
+            logger.info("📤 Uploading BOL template...")
             upload = self.parser.upload_file(template_path)
             bol_template_file_id = upload.file_id if hasattr(upload, 'file_id') else str(upload)
         
@@ -1432,7 +1828,7 @@ class DocumentManager:
             if schema_path.exists():
                 with open(schema_path, 'r') as f:
                     form_schema = json.load(f)
-                print(f"✓ Loaded form schema from {schema_path}")
+                logger.info("✓ Loaded form schema from %s", schema_path)
         elif use_saved_schema:
             if self.use_supabase:
                 schema_data = self.supabase.get_form_schema("BOL_Template.pdf")
@@ -1440,7 +1836,7 @@ class DocumentManager:
                 schema_data = self.store.get_form_schema("BOL_Template.pdf")
             if schema_data:
                 form_schema = schema_data.get("schema")
-                print(f"✓ Loaded form schema from database ({schema_data.get('num_fields')} fields)")
+                logger.info("✓ Loaded form schema from database (%s fields)", schema_data.get('num_fields'))
         
         # Generate output filename
         if not output_filename:
@@ -1449,10 +1845,10 @@ class DocumentManager:
             output_filename = f"BOL_{po_name}_{timestamp}.pdf"
         
         # Set output path
-        output_path = Path(__file__).parent.parent / 'export' / output_filename
+        output_path = EXPORT_DIR / output_filename
         
         # Fill the template
-        print("✏️  Filling BOL template...")
+        logger.info("✏️  Filling BOL template...")
         fill_result = self.parser.fill_template_document(
             template_file_id=bol_template_file_id,
             fill_data=bol_data,
@@ -1463,11 +1859,13 @@ class DocumentManager:
 
         # If a schema was generated, note it
         if fill_result.get('generated_schema'):
-            print(f"🎉 Form schema auto-generated and saved! Future runs will be faster.")
+            logger.info("🎉 Form schema auto-generated and saved! Future runs will be faster.")
 
         return {
             "bol_data": bol_data,
+            "po_doc": po_doc,
             "document_url": fill_result['document_url'],
+            "document_bytes": fill_result.get('document_bytes'),
             "output_path": str(output_path),
             "template_file_id": bol_template_file_id,
             "used_schema": fill_result['used_existing_schema'],
@@ -1481,7 +1879,8 @@ class DocumentManager:
                                       use_saved_schema: bool = True,
                                       output_filename: str = None,
                                       address_overrides: Dict = None,
-                                      packing_slip_data: Dict = None) -> Dict:
+                                      packing_slip_data: Dict = None,
+                                      po_doc: Dict = None) -> Dict:
         """
         Generate Packing Slip data from PO and fill the template
         
@@ -1494,45 +1893,46 @@ class DocumentManager:
             output_filename: Name for the output file (auto-generated if not provided)
             address_overrides: Dictionary with 'ship_from' and/or 'ship_to' address overrides
             packing_slip_data: Pre-generated Packing Slip data (if provided, skips AI generation)
+            po_doc: Already-fetched PO document (if provided, skips the lookup)
         
         Returns:
-            Dictionary with packing slip data and filled document URL
+            Dictionary with packing slip data, filled document URL and the PO document used
         """
         self._init_parser()
         
         # Get PO document
-        po_doc = self.get_document(po_document_name, po_document_id)
+        po_doc = po_doc or self.get_document(po_document_name, po_document_id)
         if not po_doc:
             raise ValueError(f"Purchase Order not found")
         
         # Generate Packing Slip data only if not provided
         if packing_slip_data is None:
-            print("📦 Generating Packing Slip data from Purchase Order...")
+            logger.info("📦 Generating Packing Slip data from Purchase Order...")
             ps_data = self.generate_packing_slip_from_po(po_document_name, po_document_id, save_to_db=True)
         else:
-            print("📦 Using pre-generated Packing Slip data (skipping AI call)")
+            logger.info("📦 Using pre-generated Packing Slip data (skipping AI call)")
             ps_data = packing_slip_data
         
         # Apply address overrides if provided
         if address_overrides:
             if 'ship_from' in address_overrides:
                 ps_data['ship_from'] = address_overrides['ship_from']
-                print(f"✓ Applied ship_from address override: {address_overrides['ship_from'].get('name')}")
+                logger.info("✓ Applied ship_from address override: %s", address_overrides['ship_from'].get('name'))
             if 'ship_to' in address_overrides:
                 ps_data['ship_to'] = address_overrides['ship_to']
-                print(f"✓ Applied ship_to address override: {address_overrides['ship_to'].get('name')}")
+                logger.info("✓ Applied ship_to address override: %s", address_overrides['ship_to'].get('name'))
         
         # Get or upload template
         if not ps_template_file_id:
             # Try both PDF and Excel templates
-            template_path = Path(__file__).parent.parent / 'templates' / 'PackingSlip_Template.pdf'
+            template_path = TEMPLATES_DIR / 'PackingSlip_Template.pdf'
             if not template_path.exists():
-                template_path = Path(__file__).parent.parent / 'templates' / 'PackingSlip_Template.xlsx'
+                template_path = TEMPLATES_DIR / 'PackingSlip_Template.xlsx'
             
             if not template_path.exists():
                 raise FileNotFoundError(f"Packing Slip template not found")
             
-            print(f"📤 Uploading Packing Slip template...")
+            logger.info("📤 Uploading Packing Slip template...")
             upload = self.parser.upload_file(template_path)
             ps_template_file_id = upload.file_id if hasattr(upload, 'file_id') else str(upload)
         
@@ -1543,7 +1943,7 @@ class DocumentManager:
             if schema_path.exists():
                 with open(schema_path, 'r') as f:
                     form_schema = json.load(f)
-                print(f"✓ Loaded form schema from {schema_path}")
+                logger.info("✓ Loaded form schema from %s", schema_path)
         elif use_saved_schema:
             if self.use_supabase:
                 schema_data = self.supabase.get_form_schema("PackingSlip_Template.pdf")
@@ -1551,7 +1951,7 @@ class DocumentManager:
                 schema_data = self.store.get_form_schema("PackingSlip_Template.pdf")
             if schema_data:
                 form_schema = schema_data.get("schema")
-                print(f"✓ Loaded form schema from database ({schema_data.get('num_fields')} fields)")
+                logger.info("✓ Loaded form schema from database (%s fields)", schema_data.get('num_fields'))
         
         # Generate output filename
         if not output_filename:
@@ -1561,10 +1961,10 @@ class DocumentManager:
             output_filename = f"PackingSlip_{po_name}_{timestamp}{ext}"
         
         # Set output path
-        output_path = Path(__file__).parent.parent / 'export' / output_filename
+        output_path = EXPORT_DIR / output_filename
         
         # Fill the template
-        print("✏️  Filling Packing Slip template...")
+        logger.info("✏️  Filling Packing Slip template...")
         fill_result = self.parser.fill_template_document(
             template_file_id=ps_template_file_id,
             fill_data=ps_data,
@@ -1575,11 +1975,13 @@ class DocumentManager:
 
         # If a schema was generated, note it
         if fill_result.get('generated_schema'):
-            print(f"🎉 Form schema auto-generated and saved! Future runs will be faster.")
+            logger.info("🎉 Form schema auto-generated and saved! Future runs will be faster.")
 
         return {
             "packing_slip_data": ps_data,
+            "po_doc": po_doc,
             "document_url": fill_result['document_url'],
+            "document_bytes": fill_result.get('document_bytes'),
             "output_path": str(output_path),
             "template_file_id": ps_template_file_id,
             "used_schema": fill_result['used_existing_schema'],
@@ -1710,9 +2112,9 @@ def setup_form_schemas():
     schemas = {}
 
     # BOL Template Schema
-    bol_template = Path(__file__).parent.parent / 'templates' / 'BOL_Template.pdf'
+    bol_template = TEMPLATES_DIR / 'BOL_Template.pdf'
     if bol_template.exists():
-        print("📋 Generating BOL form schema...")
+        logger.info("📋 Generating BOL form schema...")
         upload = manager.parser.upload_file(bol_template)
         file_id = upload.file_id if hasattr(upload, 'file_id') else str(upload)
 
@@ -1731,13 +2133,13 @@ def setup_form_schemas():
             template_file_id=file_id,
             description="Bill of Lading form schema for faster document generation"
         )
-        print(f"✓ Saved BOL schema to Supabase ({len(schema)} fields)")
+        logger.info("✓ Saved BOL schema to Supabase (%d fields)", len(schema))
         schemas['bol'] = schema
 
     # Packing Slip Template Schema
-    ps_template = Path(__file__).parent.parent / 'templates' / 'PackingSlip_Template.pdf'
+    ps_template = TEMPLATES_DIR / 'PackingSlip_Template.pdf'
     if ps_template.exists():
-        print("📦 Generating Packing Slip form schema...")
+        logger.info("📦 Generating Packing Slip form schema...")
         upload = manager.parser.upload_file(ps_template)
         file_id = upload.file_id if hasattr(upload, 'file_id') else str(upload)
 
@@ -1794,11 +2196,11 @@ TOTAL: 3500
             template_file_id=file_id,
             description="Packing Slip form schema for faster document generation"
         )
-        print(f"✓ Saved Packing Slip schema to Supabase ({len(schema)} fields)")
+        logger.info("✓ Saved Packing Slip schema to Supabase (%d fields)", len(schema))
         schemas['packing_slip'] = schema
 
-    print("\n✅ Form schemas generated and saved to Supabase!")
-    print("These schemas will be used automatically for faster form filling.")
+    logger.info("✅ Form schemas generated and saved to Supabase; "
+                "they will be used automatically for faster form filling")
 
     return schemas
 
@@ -1826,7 +2228,7 @@ def generate_form_schema_for_template(template_path: str, sample_instructions: s
     if not template_path.exists():
         raise FileNotFoundError(f"Template not found: {template_path}")
 
-    print(f"📋 Generating form schema for {template_path.name}...")
+    logger.info("📋 Generating form schema for %s...", template_path.name)
 
     # Upload template
     upload = manager.parser.upload_file(template_path)
@@ -1843,7 +2245,7 @@ def generate_form_schema_for_template(template_path: str, sample_instructions: s
         description=description
     )
 
-    print(f"✓ Generated and saved schema ({len(schema)} fields)")
+    logger.info("✓ Generated and saved schema (%d fields)", len(schema))
 
     return schema_data
 
@@ -9,6 +9,7 @@ This script demonstrates the full workflow:
 4. Save to export/ folder
 """
 
+import logging
 from pathlib import Path
 import sys
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
@@ -202,6 +203,9 @@ def setup_schemas():
 
 if __name__ == "__main__":
     import sys
+
+    # Show the backend's progress messages on the console
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     
     if len(sys.argv) > 1 and sys.argv[1] == "setup":
         # Run one-time schema setup
@@ -4,6 +4,7 @@ Logistics Document Management System
 Main entry point for processing Purchase Orders and generating shipping documents
 """
 
+import logging
 from pathlib import Path
 from .backend import DocumentManager, process_purchase_order
 import json
@@ -71,4 +72,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Show the backend's progress messages on the console
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     main()
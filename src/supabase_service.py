@@ -5,15 +5,63 @@ Handles all database and storage operations with Supabase
 
 import os
 import json
-from typing import List, Dict, Optional, Any
+import logging
+import threading
+import time
+from typing import List, Dict, Optional, Any, BinaryIO, Union
 from datetime import datetime
 from pathlib import Path
+import httpx
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+try:
+    from postgrest.exceptions import APIError
+except ImportError:  # pragma: no cover - postgrest always ships with supabase-py
+    APIError = RuntimeError
+
+try:
+    from storage3.utils import StorageException
+except ImportError:
+    StorageException = RuntimeError
+
+
+# Errors raised by the Supabase client for failed queries, storage calls and
+# transport problems. Callers catch this instead of a bare Exception.
+SupabaseError = (APIError, StorageException, httpx.HTTPError)
+
+# Keep-alive pool shared by all PostgREST/Storage calls in this process.
+# Sized to stay well under Supabase's pooler connection ceiling per worker.
+HTTP_POOL_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=10, keepalive_expiry=30)
+HTTP_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+# With the h2 package installed, concurrent calls from request threads and the
+# worker pools share connections as multiplexed HTTP/2 streams
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+# How long slow-changing lookup lists (dropdown data) are reused per process
+LIST_CACHE_TTL = 30  # seconds
+
+
+def _create_pooled_client(url: str, key: str, http_client: httpx.Client) -> Client:
+    """Create a Supabase client backed by the given pooled keep-alive httpx client"""
+    try:
+        from supabase.lib.client_options import SyncClientOptions
+        return create_client(url, key, options=SyncClientOptions(httpx_client=http_client))
+    except (ImportError, TypeError):
+        # Older supabase-py versions don't accept a custom httpx client
+        return create_client(url, key)
+
+
 class SupabaseService:
     """Service class for Supabase database and storage operations"""
 
@@ -28,13 +76,42 @@ class SupabaseService:
                 "Please create a .env file with these values."
             )
 
-        self.client: Client = create_client(self.url, self.key)
+        # One keep-alive pool per process, shared by the Supabase client and by
+        # direct HTTP calls (e.g. streaming storage objects)
+        self.http = httpx.Client(limits=HTTP_POOL_LIMITS, timeout=HTTP_TIMEOUT, http2=HTTP2_ENABLED)
+        self.client: Client = _create_pooled_client(self.url, self.key, self.http)
 
         # Storage bucket names
         self.BUCKET_UPLOADS = 'document-uploads'
         self.BUCKET_GENERATED = 'generated-documents'
         self.BUCKET_TEMPLATES = 'templates'
 
+        # Short-lived cache for lookup lists: {key: (expires_at, data)}
+        self._list_cache: Dict[str, tuple] = {}
+
+        # Per-table write counters for this process, used to build list-page ETags
+        self._versions: Dict[str, int] = {}
+
+    def _cached_list(self, key: str, loader) -> Any:
+        """Return cached rows for key, re-running loader() once the TTL expires"""
+        now = time.monotonic()
+        entry = self._list_cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+        data = loader()
+        self._list_cache[key] = (now + LIST_CACHE_TTL, data)
+        return data
+
+    def _invalidate(self, *keys: str):
+        """Drop cached lookup lists and bump their data versions after a write"""
+        for key in keys:
+            self._list_cache.pop(key, None)
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def data_version(self, *tables: str) -> str:
+        """Combined write version of the given tables (changes on every write in this process)"""
+        return '.'.join(str(self._versions.get(table, 0)) for table in tables)
+
     # ========================================================================
     # ACCOUNT (CUSTOMER) OPERATIONS
     # ========================================================================
@@ -50,6 +127,7 @@ class SupabaseService:
         }
 
         result = self.client.table('accounts').insert(data).execute()
+        self._invalidate('accounts')
         return result.data[0] if result.data else None
 
     def get_account(self, customer_id: str) -> Optional[Dict[str, Any]]:
@@ -71,7 +149,10 @@ class SupabaseService:
         return result.data[0] if result.data else None
 
     def list_accounts(self) -> List[Dict[str, Any]]:
-        """List all accounts"""
+        """List all accounts (cached briefly, used by many form dropdowns)"""
+        return self._cached_list('accounts', self._fetch_accounts)
+
+    def _fetch_accounts(self) -> List[Dict[str, Any]]:
         result = self.client.table('accounts')\
             .select('*')\
             .order('company_name')\
@@ -85,6 +166,7 @@ class SupabaseService:
             .update(data)\
             .eq('customer_id', customer_id)\
             .execute()
+        self._invalidate('accounts')
 
         return result.data[0] if result.data else None
 
@@ -94,6 +176,7 @@ class SupabaseService:
             .delete()\
             .eq('customer_id', customer_id)\
             .execute()
+        self._invalidate('accounts')
 
         return len(result.data) > 0 if result.data else False
 
@@ -101,11 +184,11 @@ class SupabaseService:
         """Get account with all associated documents, grouped by PO"""
         account = self.get_account(customer_id)
         if not account:
-            print(f"⚠️ Account not found for customer_id: {customer_id}")
+            logger.warning("⚠️ Account not found for customer_id: %s", customer_id)
             return None
 
         account_uuid = account['id']
-        print(f"✓ Found account: {account['company_name']} (UUID: {account_uuid})")
+        logger.debug("✓ Found account: %s (UUID: %s)", account['company_name'], account_uuid)
 
         # Get all documents for this account
         documents = self.client.table('documents')\
@@ -115,7 +198,7 @@ class SupabaseService:
             .execute()
 
         account['documents'] = documents.data or []
-        print(f"✓ Found {len(account['documents'])} total documents for this account")
+        logger.debug("✓ Found %s total documents for this account", len(account['documents']))
 
         # Group documents by type
         pos = [d for d in account['documents'] if d['document_type'] == 'PO']
@@ -138,9 +221,9 @@ class SupabaseService:
         account['total_bols'] = len(all_bols)
         account['total_packing_slips'] = len(all_packing_slips)
 
-        print(f"  - POs: {len(pos)}")
-        print(f"  - BOLs: {len(all_bols)}")
-        print(f"  - Packing Slips: {len(all_packing_slips)}")
+        logger.debug("  - POs: %s", len(pos))
+        logger.debug("  - BOLs: %s", len(all_bols))
+        logger.debug("  - Packing Slips: %s", len(all_packing_slips))
 
         return account
 
@@ -168,6 +251,7 @@ class SupabaseService:
         }
 
         result = self.client.table('addresses').insert(data).execute()
+        self._invalidate('addresses', 'seller_companies', 'default_seller_company')  # seller rows embed their addresses
         return result.data[0] if result.data else None
 
     def get_address(self, address_id: str) -> Optional[Dict[str, Any]]:
@@ -215,12 +299,29 @@ class SupabaseService:
 
         return result.data or []
 
+    def list_all_customer_addresses_with_customer(self) -> List[Dict[str, Any]]:
+        """List all customer-linked addresses with their account embedded as 'customer'"""
+        result = self.client.table('addresses')\
+            .select('*, account:accounts(*)')\
+            .not_.is_('account_id', 'null')\
+            .order('name')\
+            .execute()
+
+        addresses = result.data or []
+        for addr in addresses:
+            addr['customer'] = addr.pop('account', None)
+
+        # Keep the customer-grouped ordering of the per-customer listing
+        addresses.sort(key=lambda a: ((a['customer'] or {}).get('company_name') or ''))
+        return addresses
+
     def update_address(self, address_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Update an address"""
         result = self.client.table('addresses')\
             .update(data)\
             .eq('id', address_id)\
             .execute()
+        self._invalidate('addresses', 'seller_companies', 'default_seller_company')
 
         return result.data[0] if result.data else None
 
@@ -230,6 +331,7 @@ class SupabaseService:
             .delete()\
             .eq('id', address_id)\
             .execute()
+        self._invalidate('addresses', 'seller_companies', 'default_seller_company')
 
         return len(result.data) > 0 if result.data else False
 
@@ -249,6 +351,7 @@ class SupabaseService:
         }
 
         result = self.client.table('seller_companies').insert(data).execute()
+        self._invalidate('seller_companies', 'default_seller_company')
         return result.data[0] if result.data else None
 
     def get_seller_company(self, seller_id: str) -> Optional[Dict[str, Any]]:
@@ -261,7 +364,10 @@ class SupabaseService:
         return result.data[0] if result.data else None
 
     def get_default_seller_company(self) -> Optional[Dict[str, Any]]:
-        """Get the default seller company with addresses"""
+        """Get the default seller company with addresses (cached briefly)"""
+        return self._cached_list('default_seller_company', self._fetch_default_seller_company)
+
+    def _fetch_default_seller_company(self) -> Optional[Dict[str, Any]]:
         result = self.client.table('seller_companies')\
             .select('*, addresses(*)')\
             .eq('is_default', True)\
@@ -279,7 +385,10 @@ class SupabaseService:
         return result.data[0] if result.data else None
 
     def list_seller_companies(self) -> List[Dict[str, Any]]:
-        """List all seller companies with their addresses"""
+        """List all seller companies with their addresses (cached briefly)"""
+        return self._cached_list('seller_companies', self._fetch_seller_companies)
+
+    def _fetch_seller_companies(self) -> List[Dict[str, Any]]:
         result = self.client.table('seller_companies')\
             .select('*, addresses(*)')\
             .order('company_name')\
@@ -293,6 +402,7 @@ class SupabaseService:
             .update(data)\
             .eq('id', seller_id)\
             .execute()
+        self._invalidate('seller_companies', 'default_seller_company')
 
         return result.data[0] if result.data else None
 
@@ -302,6 +412,7 @@ class SupabaseService:
             .delete()\
             .eq('id', seller_id)\
             .execute()
+        self._invalidate('seller_companies', 'default_seller_company')
 
         return len(result.data) > 0 if result.data else False
 
@@ -312,28 +423,22 @@ class SupabaseService:
     def get_next_bol_number(self, account_id: str) -> str:
         """
         Generate next BOL number for a customer: YYYYMMDD + sequence number
-        Sequence is based on how many POs this customer has (1-indexed)
+        Sequence is based on how many POs this customer has (1-indexed), counted
+        in Postgres by the next_bol_number() function
         """
-        from datetime import datetime
-        
-        # Count POs for this customer
-        result = self.client.table('documents')\
-            .select('id', count='exact')\
-            .eq('account_id', account_id)\
-            .eq('document_type', 'PO')\
-            .execute()
+        from datetime import date
 
-        po_count = (result.count or 0) + 1  # Next sequence number
-        
-        date_prefix = datetime.now().strftime('%Y%m%d')
-        sequence = str(po_count).zfill(2)  # 01, 02, 03, etc.
-        
-        return f"{date_prefix}{sequence}"
+        result = self.client.rpc('next_bol_number', {
+            'account': account_id,
+            'bol_date': date.today().isoformat(),
+        }).execute()
+
+        return result.data
 
     def get_customer_po_count(self, account_id: str) -> int:
         """Get count of POs for a customer"""
         result = self.client.table('documents')\
-            .select('id', count='exact')\
+            .select('id', count='exact', head=True)\
             .eq('account_id', account_id)\
             .eq('document_type', 'PO')\
             .execute()
@@ -357,6 +462,7 @@ class SupabaseService:
         }
 
         result = self.client.table('products').insert(data).execute()
+        self._invalidate('products')
         return result.data[0] if result.data else None
 
     def get_product(self, product_id: str) -> Optional[Dict[str, Any]]:
@@ -383,6 +489,7 @@ class SupabaseService:
             .update(data)\
             .eq('id', product_id)\
             .execute()
+        self._invalidate('products')
 
         return result.data[0] if result.data else None
 
@@ -392,6 +499,7 @@ class SupabaseService:
             .delete()\
             .eq('id', product_id)\
             .execute()
+        self._invalidate('products')
 
         return len(result.data) > 0 if result.data else False
 
@@ -399,10 +507,11 @@ class SupabaseService:
     # DOCUMENT OPERATIONS
     # ========================================================================
 
-    def create_document(self, document_id: int, document_type: str, document_name: str,
-                       account_id: Optional[str] = None, **kwargs) -> Dict[str, Any]:
-        """Create a new document record"""
-        data = {
+    @staticmethod
+    def _document_row(document_id: int, document_type: str, document_name: str,
+                      account_id: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Build a documents row from create_document's arguments"""
+        row = {
             'document_id': document_id,
             'document_type': document_type,
             'document_name': document_name,
@@ -412,10 +521,63 @@ class SupabaseService:
             'parsed_data': kwargs.get('parsed_data'),
             'status': kwargs.get('status', 'processed')
         }
+        if kwargs.get('content_hash'):
+            row['content_hash'] = kwargs['content_hash']
+        return row
 
-        result = self.client.table('documents').insert(data).execute()
+    def create_document(self, document_id: int, document_type: str, document_name: str,
+                       account_id: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Create a new document record
+
+        A content_hash already held by another document (the same file uploaded
+        concurrently) is dropped rather than failing the insert; the first row
+        keeps it for get_document_by_hash.
+        """
+        data = self._document_row(document_id, document_type, document_name, account_id, **kwargs)
+
+        try:
+            result = self.client.table('documents').insert(data).execute()
+        except APIError as e:
+            if getattr(e, 'code', None) != '23505' or 'content_hash' not in data:
+                raise
+            del data['content_hash']
+            result = self.client.table('documents').insert(data).execute()
         return result.data[0] if result.data else None
 
+    def allocate_document_ids(self, count: int) -> List[int]:
+        """
+        Reserve fresh document_ids from the documents_document_id_seq sequence
+
+        Args:
+            count: How many ids to reserve
+
+        Returns:
+            count ascending document_ids, unique across all writers
+        """
+        if count <= 0:
+            return []
+        result = self.client.rpc('next_document_id', {'n': count}).execute()
+        return list(result.data or [])
+
+    def create_documents_with_new_ids(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create document records under freshly allocated document_ids, in one insert
+
+        Args:
+            documents: create_document arguments for each record, without document_id
+
+        Returns:
+            The created rows (with their document_id)
+        """
+        ids = self.allocate_document_ids(len(documents))
+        rows = [self._document_row(document_id=document_id, **doc)
+                for document_id, doc in zip(ids, documents)]
+        if not rows:
+            return []
+        result = self.client.table('documents').insert(rows).execute()
+        return result.data or []
+
     def get_document(self, document_id: int) -> Optional[Dict[str, Any]]:
         """Get document by document_id"""
         result = self.client.table('documents')\
@@ -425,14 +587,41 @@ class SupabaseService:
 
         return result.data[0] if result.data else None
 
-    def list_documents(self, document_type: Optional[str] = None) -> List[Dict[str, Any]]:
-        """List all documents, optionally filtered by type"""
+    def get_document_by_hash(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Get the document first uploaded with this sha256 content hash"""
+        result = self.client.table('documents')\
+            .select('*')\
+            .eq('content_hash', content_hash)\
+            .limit(1)\
+            .execute()
+
+        return result.data[0] if result.data else None
+
+    def get_document_by_name(self, document_name: str) -> Optional[Dict[str, Any]]:
+        """Get the newest document named document_name, filtered server-side"""
+        result = self.client.table('documents')\
+            .select('*')\
+            .eq('document_name', document_name)\
+            .order('created_at', desc=True)\
+            .limit(1)\
+            .execute()
+
+        return result.data[0] if result.data else None
+
+    def list_documents(self, document_type: Optional[str] = None,
+                       limit: Optional[int] = None,
+                       order: str = 'created_at') -> List[Dict[str, Any]]:
+        """List documents (newest first by `order`), optionally filtered by type and limited"""
         query = self.client.table('documents').select('*')
 
         if document_type:
             query = query.eq('document_type', document_type)
 
-        result = query.order('created_at', desc=True).execute()
+        query = query.order(order, desc=True)
+        if limit:
+            query = query.limit(limit)
+
+        result = query.execute()
         return result.data or []
 
     def update_document(self, document_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -466,8 +655,11 @@ class SupabaseService:
 
     def get_generated_data(self, document_id: int) -> Dict[str, Any]:
         """Retrieve stored BOL and Packing Slip data from PO document"""
-        doc = self.get_document(document_id)
-        
+        return self.generated_data_from_doc(self.get_document(document_id))
+
+    @staticmethod
+    def generated_data_from_doc(doc: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Extract stored BOL and Packing Slip data from an already-fetched PO document row"""
         if not doc:
             return {}
         
@@ -489,6 +681,56 @@ class SupabaseService:
         
         return result
 
+    def get_review_bundle(self, document_id: int, account_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fetch everything the PO review page needs with as few round-trips as possible.
+
+        The document row is fetched with its account and that account's addresses
+        embedded, stored BOL/Packing Slip data is read from the same row, and the
+        default seller is picked from the (cached) seller company list.
+
+        Args:
+            document_id: PO document_id
+            account_id: Account UUID selected for this review (usually the PO's own account)
+
+        Returns:
+            Dictionary with doc, customer, customer_addresses, seller_companies,
+            default_seller and cached_data (as returned by get_generated_data)
+        """
+        result = self.client.table('documents')\
+            .select('*, account:accounts(*, addresses(*))')\
+            .eq('document_id', document_id)\
+            .execute()
+
+        doc = result.data[0] if result.data else None
+        account = doc.pop('account', None) if doc else None
+
+        customer = None
+        customer_addresses = []
+        if account_id:
+            if account and account.get('id') == account_id:
+                customer_addresses = sorted(account.pop('addresses', None) or [],
+                                            key=lambda a: a.get('name') or '')
+                customer = account
+            else:
+                # Reviewing under a different account than the PO's own
+                customer = self.get_account_by_id(account_id)
+                if customer:
+                    customer_addresses = self.list_customer_addresses(account_id)
+
+        seller_companies = self.list_seller_companies()
+        default_seller = next((s for s in seller_companies if s.get('is_default')),
+                              seller_companies[0] if seller_companies else None)
+
+        return {
+            'doc': doc,
+            'customer': customer,
+            'customer_addresses': customer_addresses,
+            'seller_companies': seller_companies,
+            'default_seller': default_seller,
+            'cached_data': self.generated_data_from_doc(doc),
+        }
+
     def link_documents(self, po_document_id: int, generated_document_id: int, relationship_type: str):
         """Link a PO to a generated document (BOL or PACKING_SLIP)"""
         data = {
@@ -500,6 +742,54 @@ class SupabaseService:
         result = self.client.table('document_relationships').insert(data).execute()
         return result.data[0] if result.data else None
 
+    def link_documents_bulk(self, po_document_id: int, links: List[tuple]) -> List[Dict[str, Any]]:
+        """Link a PO to several generated documents in one insert; links are (generated_document_id, relationship_type)"""
+        rows = [
+            {
+                'po_document_id': po_document_id,
+                'generated_document_id': generated_document_id,
+                'relationship_type': relationship_type
+            }
+            for generated_document_id, relationship_type in links
+        ]
+
+        result = self.client.table('document_relationships').insert(rows).execute()
+        return result.data or []
+
+    def create_generated_documents(self, po_document_id: int,
+                                   documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create generated document records and link them to their PO.
+
+        The records go in as one insert and the links as another; if linking
+        fails the new records are deleted again, so no unlinked BOL or packing
+        slip rows are left behind.
+
+        Args:
+            po_document_id: document_id of the source PO
+            documents: create_document arguments for each record, without document_id;
+                document_type doubles as the relationship type
+
+        Returns:
+            The created rows (with their document_id)
+        """
+        if not documents:
+            return []
+
+        created = self.create_documents_with_new_ids(documents)
+        try:
+            self.link_documents_bulk(po_document_id, [
+                (row['document_id'], row['document_type']) for row in created
+            ])
+        except Exception:
+            self.client.table('documents')\
+                .delete()\
+                .in_('document_id', [row['document_id'] for row in created])\
+                .execute()
+            raise
+
+        return created
+
     def get_related_documents(self, po_document_id: int) -> Dict[str, List[Dict[str, Any]]]:
         """Get all documents generated from a PO"""
         result = self.client.table('document_relationships')\
@@ -542,10 +832,16 @@ class SupabaseService:
             # Backwards compatibility for older supabase-py versions
             result = table.upsert(data).execute()
 
+        self._invalidate('form_schemas')
         return result.data[0] if result.data else None
 
     def get_form_schema(self, template_name: str) -> Optional[Dict[str, Any]]:
-        """Get form schema by template name"""
+        """Get form schema by template name (from the cached schema list when present)"""
+        for schema_data in self.list_form_schemas():
+            if schema_data['template_name'] == template_name:
+                return schema_data
+
+        # Not in the cached list: it may have been saved by another process since
         result = self.client.table('form_schemas')\
             .select('*')\
             .eq('template_name', template_name)\
@@ -562,7 +858,10 @@ class SupabaseService:
         return None
 
     def list_form_schemas(self) -> List[Dict[str, Any]]:
-        """List all form schemas"""
+        """List all form schemas (cached briefly)"""
+        return self._cached_list('form_schemas', self._fetch_form_schemas)
+
+    def _fetch_form_schemas(self) -> List[Dict[str, Any]]:
         result = self.client.table('form_schemas')\
             .select('*')\
             .order('template_name')\
@@ -589,7 +888,8 @@ class SupabaseService:
             .update(data)\
             .eq('template_name', template_name)\
             .execute()
-        
+
+        self._invalidate('form_schemas')
         return result.data[0] if result.data else None
 
     def delete_form_schema(self, template_name: str) -> bool:
@@ -599,14 +899,37 @@ class SupabaseService:
             .eq('template_name', template_name)\
             .execute()
 
+        self._invalidate('form_schemas')
         return len(result.data) > 0 if result.data else False
 
+    # ========================================================================
+    # AI COMPLETION CACHE
+    # ========================================================================
+
+    def get_ai_completion(self, prompt_hash: str) -> Optional[str]:
+        """Stored reply text for a prompt hash, if any worker has generated it before"""
+        result = self.client.table('ai_completions')\
+            .select('response')\
+            .eq('prompt_hash', prompt_hash)\
+            .limit(1)\
+            .execute()
+
+        return result.data[0]['response'] if result.data else None
+
+    def store_ai_completion(self, prompt_hash: str, model: str, response: str):
+        """Store a reply text under its prompt hash (the first stored reply wins)"""
+        self.client.table('ai_completions')\
+            .upsert({'prompt_hash': prompt_hash, 'model': model, 'response': response},
+                    on_conflict='prompt_hash', ignore_duplicates=True)\
+            .execute()
+
     # ========================================================================
     # STORAGE OPERATIONS
     # ========================================================================
 
-    def upload_file(self, bucket: str, file_path: str, file_data: bytes, content_type: str = 'application/pdf') -> str:
-        """Upload a file to Supabase storage"""
+    def upload_file(self, bucket: str, file_path: str, file_data: Union[bytes, BinaryIO],
+                    content_type: str = 'application/pdf') -> str:
+        """Upload a file to Supabase storage (file_data may be bytes or a binary file opened with open(..., 'rb'), which is streamed)"""
         result = self.client.storage.from_(bucket).upload(
             file_path,
             file_data,
@@ -625,14 +948,51 @@ class SupabaseService:
         result = self.client.storage.from_(bucket).download(file_path)
         return result
 
+    def open_file_stream(self, bucket: str, file_path: str,
+                         if_none_match: Optional[str] = None) -> httpx.Response:
+        """
+        Start a streaming download of a storage object over the pooled HTTP client.
+
+        Args:
+            bucket: Storage bucket name
+            file_path: Object path within the bucket
+            if_none_match: Client's If-None-Match header, forwarded so storage can answer 304
+
+        Returns:
+            An open httpx.Response whose body has not been read yet (status 304 if
+            the client's copy is current). The caller must close it (e.g. via
+            Response.call_on_close) once the body is consumed.
+        """
+        from urllib.parse import quote
+        url = f"{self.url.rstrip('/')}/storage/v1/object/{bucket}/{quote(file_path)}"
+        headers = {
+            'apikey': self.key,
+            'Authorization': f'Bearer {self.key}',
+            # Uncompressed, so Content-Length matches the bytes relayed to the client
+            'Accept-Encoding': 'identity',
+        }
+        if if_none_match:
+            headers['If-None-Match'] = if_none_match
+        request = self.http.build_request('GET', url, headers=headers)
+        response = self.http.send(request, stream=True)
+        if response.is_error:
+            response.close()
+            response.raise_for_status()
+        return response
+
     def delete_file(self, bucket: str, file_path: str) -> bool:
         """Delete a file from Supabase storage"""
         result = self.client.storage.from_(bucket).remove([file_path])
         return len(result) > 0
 
-    def get_signed_url(self, bucket: str, file_path: str, expires_in: int = 3600) -> str:
-        """Get a signed URL for private file access"""
-        result = self.client.storage.from_(bucket).create_signed_url(file_path, expires_in)
+    def get_signed_url(self, bucket: str, file_path: str, expires_in: int = 3600,
+                       download: Optional[str] = None) -> str:
+        """Get a signed URL for private file access (served as an attachment named `download` if given)"""
+        bucket_api = self.client.storage.from_(bucket)
+        if download:
+            result = bucket_api.create_signed_url(file_path, expires_in, {'download': download})
+        else:
+            result = bucket_api.create_signed_url(file_path, expires_in)
         return result.get('signedURL') if result else None
 
     # ========================================================================
@@ -644,28 +1004,28 @@ class SupabaseService:
         stats = {}
 
         # Count accounts
-        accounts = self.client.table('accounts').select('id', count='exact').execute()
+        accounts = self.client.table('accounts').select('id', count='exact', head=True).execute()
         stats['total_customers'] = accounts.count if accounts.count is not None else 0
 
         # Count products
-        products = self.client.table('products').select('id', count='exact').execute()
+        products = self.client.table('products').select('id', count='exact', head=True).execute()
         stats['total_products'] = products.count if products.count is not None else 0
 
         # Count documents by type
-        all_docs = self.client.table('documents').select('id', count='exact').execute()
+        all_docs = self.client.table('documents').select('id', count='exact', head=True).execute()
         stats['total_documents'] = all_docs.count if all_docs.count is not None else 0
 
-        pos = self.client.table('documents').select('id', count='exact').eq('document_type', 'PO').execute()
+        pos = self.client.table('documents').select('id', count='exact', head=True).eq('document_type', 'PO').execute()
         stats['total_pos'] = pos.count if pos.count is not None else 0
 
-        bols = self.client.table('documents').select('id', count='exact').eq('document_type', 'BOL').execute()
+        bols = self.client.table('documents').select('id', count='exact', head=True).eq('document_type', 'BOL').execute()
         stats['total_bols'] = bols.count if bols.count is not None else 0
 
-        slips = self.client.table('documents').select('id', count='exact').eq('document_type', 'PACKING_SLIP').execute()
+        slips = self.client.table('documents').select('id', count='exact', head=True).eq('document_type', 'PACKING_SLIP').execute()
         stats['total_packing_slips'] = slips.count if slips.count is not None else 0
 
         # Count form schemas
-        schemas = self.client.table('form_schemas').select('id', count='exact').execute()
+        schemas = self.client.table('form_schemas').select('id', count='exact', head=True).execute()
         stats['total_form_schemas'] = schemas.count if schemas.count is not None else 0
 
         return stats
@@ -673,10 +1033,13 @@ class SupabaseService:
 
 # Global instance
 _supabase_service = None
+_supabase_service_lock = threading.Lock()
 
 def get_supabase_service() -> SupabaseService:
-    """Get or create the global Supabase service instance"""
+    """Get or create the global Supabase service instance (one pooled client per process)"""
     global _supabase_service
     if _supabase_service is None:
-        _supabase_service = SupabaseService()
+        with _supabase_service_lock:
+            if _supabase_service is None:
+                _supabase_service = SupabaseService()
     return _supabase_service
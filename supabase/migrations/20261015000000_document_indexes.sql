@@ -0,0 +1,28 @@
+-- Indexes for the document lookups made by SupabaseService.
+-- Plain CREATE INDEX (not CONCURRENTLY) so the file can run inside the
+-- migration transaction; on a large live table, run the statements by hand
+-- with CONCURRENTLY instead.
+
+-- get_document / update_document / link lookups, and the max(document_id)
+-- that seeds documents_document_id_seq. Not UNIQUE: tables written by the old
+-- max + 1 allocation may already hold duplicate ids; new ids come from
+-- documents_document_id_seq (20261015000300_document_id_sequence.sql)
+CREATE INDEX IF NOT EXISTS documents_document_id_idx
+    ON documents (document_id);
+
+-- get_account_with_documents (account_id, newest first) and the per-customer
+-- PO counts behind get_next_bol_number / get_customer_po_count
+CREATE INDEX IF NOT EXISTS documents_account_type_created_idx
+    ON documents (account_id, document_type, created_at DESC);
+
+-- list_documents(document_type=...) on the dashboard, newest first
+CREATE INDEX IF NOT EXISTS documents_type_created_idx
+    ON documents (document_type, created_at DESC);
+
+-- get_related_documents and the review bundle's embedded relationships
+CREATE INDEX IF NOT EXISTS document_relationships_po_document_id_idx
+    ON document_relationships (po_document_id);
+
+-- list_addresses(account_id=...) for the customer and review pages
+CREATE INDEX IF NOT EXISTS addresses_account_id_idx
+    ON addresses (account_id);
@@ -0,0 +1,5 @@
+-- Index for SupabaseService.get_document_by_name, which DocumentManager uses
+-- to skip re-parsing a PO it has already recorded (newest match first).
+-- Plain CREATE INDEX for the same reason as 20261015000000_document_indexes.sql.
+CREATE INDEX IF NOT EXISTS documents_name_created_idx
+    ON documents (document_name, created_at DESC);
@@ -0,0 +1,18 @@
+-- next_bol_number(account, bol_date): the account's next BOL number,
+-- bol_date as YYYYMMDD followed by the account's PO count + 1, zero-padded to
+-- at least two digits (01, 02, ... 99, 100). Counted in one indexed query
+-- (documents_account_type_created_idx) for SupabaseService.get_next_bol_number.
+-- bol_date comes from the app so the prefix follows the server's local date.
+CREATE OR REPLACE FUNCTION next_bol_number(account uuid, bol_date date DEFAULT current_date)
+RETURNS text
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT to_char(bol_date, 'YYYYMMDD') || lpad(n::text, greatest(2, length(n::text)), '0')
+    FROM (
+        SELECT count(*) + 1 AS n
+        FROM documents
+        WHERE account_id = account
+          AND document_type = 'PO'
+    ) AS po_count;
+$$;
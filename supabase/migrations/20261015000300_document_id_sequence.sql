@@ -0,0 +1,24 @@
+-- Allocate documents.document_id from a sequence instead of reading max + 1
+-- in the app, which let concurrent uploads/generations pick the same id.
+
+CREATE SEQUENCE IF NOT EXISTS documents_document_id_seq AS bigint;
+ALTER SEQUENCE documents_document_id_seq OWNED BY documents.document_id;
+
+-- Continue after the ids already in use
+SELECT setval('documents_document_id_seq',
+              coalesce((SELECT max(document_id) FROM documents), 0) + 1,
+              false);
+
+-- Rows inserted without a document_id get the next one
+ALTER TABLE documents
+    ALTER COLUMN document_id SET DEFAULT nextval('documents_document_id_seq');
+
+-- next_document_id(n): n fresh document_ids in one round-trip, for records the
+-- app has to number before inserting (SupabaseService.allocate_document_ids)
+CREATE OR REPLACE FUNCTION next_document_id(n integer DEFAULT 1)
+RETURNS bigint[]
+LANGUAGE sql
+VOLATILE
+AS $$
+    SELECT array(SELECT nextval('documents_document_id_seq') FROM generate_series(1, n));
+$$;
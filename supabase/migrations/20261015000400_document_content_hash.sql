@@ -0,0 +1,8 @@
+-- sha256 of an uploaded PO's bytes, so re-uploads of the same file reuse its
+-- parse instead of going back to Reducto (SupabaseService.get_document_by_hash).
+-- Only the first upload of a file carries its hash; later copies leave it NULL,
+-- which the unique index allows any number of times.
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_hash text;
+
+CREATE UNIQUE INDEX IF NOT EXISTS documents_content_hash_idx
+    ON documents (content_hash);
@@ -0,0 +1,10 @@
+-- AI completions shared by every worker and instance, keyed by the sha256 of
+-- the model and full prompt (PO text, template, company context and date), so
+-- the same PO content is sent to the model once (SupabaseService.get_ai_completion
+-- / store_ai_completion). Rows are never updated; prune by created_at if needed.
+CREATE TABLE IF NOT EXISTS ai_completions (
+    prompt_hash text PRIMARY KEY,
+    model text NOT NULL,
+    response text NOT NULL,
+    created_at timestamptz NOT NULL DEFAULT now()
+);